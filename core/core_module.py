@@ -1,18 +1,118 @@
+import functools
+import multiprocessing
+import os
+import platform
+
 import numpy as np
 from typing import List, Dict, Tuple
 from sentence_transformers import SentenceTransformer
 from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
 import torch
 
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+try:
+    from sentence_transformers.quantization import quantize_embeddings
+except ImportError:
+    quantize_embeddings = None
+
+def _truncate_pair(premise: List[int], hypothesis: List[int], budget: int) -> Tuple[List[int], List[int]]:
+    """
+    Truncates a (premise, hypothesis) id pair to a shared token budget.
+
+    Longest-first: the side that fits in its half of the budget is kept whole
+    and the other side gets the remainder, so a long premise can never crowd
+    the hypothesis out of the encoded pair entirely.
+
+    Args:
+        premise: Premise token ids, without special tokens.
+        hypothesis: Hypothesis token ids, without special tokens.
+        budget: Combined id budget, excluding special tokens.
+
+    Returns:
+        The (premise, hypothesis) ids, truncated to fit the budget.
+    """
+    if len(premise) + len(hypothesis) <= budget:
+        return premise, hypothesis
+    half = budget // 2
+    if len(premise) <= half:
+        return premise, hypothesis[:budget - len(premise)]
+    if len(hypothesis) <= half:
+        return premise[:budget - len(hypothesis)], hypothesis
+    return premise[:budget - half], hypothesis[:half]
+
+
 class CORE:
+    # Bounds for the per-instance memo caches below
+    _EMB_CACHE_MAX = 8192
+    _ENTAIL_CACHE_MAX = 4096
+
     def __init__(self, entailment_model_name: str = 'roberta-large-mnli', similarity_model: str = 'all-mpnet-base-v2'):
         # Load the entailment model and tokenizer
         self.entailment_tokenizer = AutoTokenizer.from_pretrained(entailment_model_name)
         self.entailment_model = AutoModelForSequenceClassification.from_pretrained(entailment_model_name)
         self.entailment_model.eval()  # Set to evaluation mode
 
-        # Load the similarity model
-        self.similarity_model = SentenceTransformer(similarity_model)
+        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        if self.device == 'cuda':
+            # FP16 on GPU: ~2x Tensor-Core throughput for the entailment forward
+            self.entailment_model = self.entailment_model.to(self.device).half()
+        else:
+            # Quantize the linear layers to dynamic INT8 for CPU inference
+            # (roughly 2x lower latency and 4x smaller weights, negligible accuracy drop on MNLI)
+            try:
+                torch.backends.quantized.engine = 'qnnpack' if platform.machine().lower() in ('arm64', 'aarch64') else 'fbgemm'
+                self.entailment_model = torch.quantization.quantize_dynamic(
+                    self.entailment_model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+            except Exception as e:
+                print(f"Dynamic quantization unavailable, using FP32 model: {e}")
+
+        # MNLI premise+hypothesis pairs rarely need more than 128 tokens; a fixed
+        # padded length keeps input shapes static so compiled graphs are reused
+        self.entailment_max_length = 128
+        # Compile only on GPU: the CPU model was just dynamically quantized,
+        # which Dynamo does not support, and reduce-overhead is a CUDA-graphs
+        # mode with nothing to capture on CPU. The eager model is kept so the
+        # first forward can fall back if compilation fails lazily there.
+        self._eager_entailment_model = self.entailment_model
+        if self.device == 'cuda':
+            try:
+                self.entailment_model = torch.compile(self.entailment_model, mode="reduce-overhead")
+            except Exception as e:
+                print(f"torch.compile unavailable, using eager entailment model: {e}")
+
+        # Load the similarity model on the ONNX Runtime backend (2-4x faster encode on CPU);
+        # fall back to the default PyTorch backend if optimum/onnxruntime is not installed.
+        try:
+            self.similarity_model = SentenceTransformer(similarity_model, backend="onnx")
+        except Exception as e:
+            print(f"ONNX backend unavailable for {similarity_model}, using PyTorch backend: {e}")
+            self.similarity_model = SentenceTransformer(similarity_model)
+        if self.device == 'cuda':
+            try:
+                self.similarity_model = self.similarity_model.to(self.device).half()
+            except Exception as e:
+                print(f"Could not move similarity model to FP16 on GPU: {e}")
+
+        # Cache of normalized embeddings keyed by text, so repeated strings
+        # (e.g. the same subclaim across pipeline stages) are encoded only
+        # once. Size-capped: with the get_core singleton this cache lives for
+        # the whole process, so unbounded growth would leak ~3KB per unique
+        # string on a warm service.
+        self._emb_cache: Dict[str, np.ndarray] = {}
+
+        # Memo of entailment probabilities keyed on (premise, hypothesis).
+        # Kept per instance rather than via lru_cache on the method, which
+        # would hold self — and the loaded models — in the cache key forever.
+        self._entail_cache: Dict[Tuple[str, str], float] = {}
+
+        # Token ids of bleached claims, keyed by the claim tuple; the bleached
+        # list is fixed per domain so it is tokenized once per CORE instance
+        self._bleached_ids_cache: Dict[Tuple[str, ...], List[List[int]]] = {}
 
     def calculate_informativeness_weights(self, subclaims: List[str], bleached_claims: List[str]) -> List[float]:
         """
@@ -25,20 +125,134 @@ class CORE:
         Returns:
             A list of informativeness weights corresponding to the subclaims.
         """
-        weights = []
-        for subclaim in subclaims:
-            min_entailment = 1.0
-            for bleached_claim in bleached_claims:
-                entail_prob = self.get_entailment_probability(bleached_claim, subclaim)
-                min_entailment = min(min_entailment, entail_prob)
-            
-            informativeness = -np.log(min_entailment) if min_entailment > 0 else 0.0  # Handle log(0)
-            weights.append(informativeness)
+        if not subclaims or not bleached_claims:
+            return [0.0] * len(subclaims)
+
+        # Build the full cross-product of (premise, hypothesis) pairs and score them
+        # in a single batched forward pass instead of one call per pair.
+        inputs = self._encode_pairs(subclaims, bleached_claims)
+
+        logits = self._entailment_forward(inputs)
+
+        # MNLI labels: 0 - contradiction, 1 - neutral, 2 - entailment.
+        # Work in log-space: log p(entail) = logit_2 - logsumexp(logits), which
+        # skips the softmax exp and the log of a near-zero probability, so no
+        # clamp is needed for numerical safety.
+        log_probs = (logits[:, 2] - torch.logsumexp(logits, dim=1)).view(len(subclaims), len(bleached_claims))
+        weights = (-log_probs.min(dim=1).values).tolist()
         return weights
 
+    def _encode_pairs(self, subclaims: List[str], bleached_claims: List[str]):
+        """
+        Tokenizes the (bleached claim, subclaim) cross-product for the entailment model.
+
+        Each bleached claim and each subclaim is tokenized exactly once (M + N
+        tokenizer calls instead of N*M); the pair inputs are then assembled from
+        the cached premise ids and padded to the fixed entailment length.
+
+        Args:
+            subclaims: A list of subclaims (hypotheses).
+            bleached_claims: A list of bleached claims (premises).
+
+        Returns:
+            A padded batch encoding, pairs ordered subclaim-major.
+        """
+        key = tuple(bleached_claims)
+        premise_ids = self._bleached_ids_cache.get(key)
+        if premise_ids is None:
+            premise_ids = self.entailment_tokenizer(bleached_claims, add_special_tokens=False)["input_ids"]
+            self._bleached_ids_cache[key] = premise_ids
+        hypothesis_ids = self.entailment_tokenizer(subclaims, add_special_tokens=False)["input_ids"]
+
+        build = self.entailment_tokenizer.build_inputs_with_special_tokens
+        max_length = self.entailment_max_length
+        # Truncate each side before assembling the pair: slicing the built
+        # sequence would drop the trailing special tokens and, for a long
+        # premise, the entire hypothesis
+        budget = max_length - self.entailment_tokenizer.num_special_tokens_to_add(pair=True)
+        features = [{"input_ids": build(*_truncate_pair(premise, hypothesis, budget))}
+                    for hypothesis in hypothesis_ids for premise in premise_ids]
+        return self.entailment_tokenizer.pad(features, padding="max_length", max_length=max_length,
+                                             return_tensors="pt")
+
+    def warm_bleached(self, bleached_claims: List[str]) -> None:
+        """
+        Pre-tokenizes a static bleached-claims list into the premise-id cache.
+
+        The bleached list is fixed for the life of the pipeline, so paying the
+        tokenizer cost once at startup keeps it out of the first
+        calculate_informativeness_weights call.
+
+        Args:
+            bleached_claims: The bleached claims to pre-tokenize.
+        """
+        key = tuple(bleached_claims)
+        if key not in self._bleached_ids_cache:
+            self._bleached_ids_cache[key] = self.entailment_tokenizer(
+                bleached_claims, add_special_tokens=False)["input_ids"]
+
+    def _entailment_forward(self, inputs) -> torch.Tensor:
+        """
+        Runs one entailment forward pass, using FP16 autocast on GPU.
+
+        Args:
+            inputs: Tokenized model inputs.
+
+        Returns:
+            The output logits as a float32 tensor on CPU.
+        """
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        try:
+            logits = self._run_entailment(inputs)
+        except Exception as e:
+            if self.entailment_model is self._eager_entailment_model:
+                raise
+            # torch.compile defers backend errors to the first real forward;
+            # drop back to the eager model permanently and retry
+            print(f"Compiled entailment model failed, using eager model: {e}")
+            self.entailment_model = self._eager_entailment_model
+            logits = self._run_entailment(inputs)
+        # Cast back to float32 before softmax to avoid FP16 over/underflow
+        return logits.float().cpu()
+
+    def _run_entailment(self, inputs) -> torch.Tensor:
+        with torch.inference_mode():
+            if self.device == 'cuda':
+                with torch.autocast(device_type='cuda', dtype=torch.float16):
+                    return self.entailment_model(**inputs).logits
+            return self.entailment_model(**inputs).logits
+
+    def _encode_cached(self, texts: List[str]) -> np.ndarray:
+        """
+        Encodes texts to normalized embeddings, reusing cached vectors for
+        strings that were already encoded.
+
+        Args:
+            texts: A list of strings to encode.
+
+        Returns:
+            A (len(texts), D) float32 array of L2-normalized embeddings.
+        """
+        missing = [text for text in texts if text not in self._emb_cache]
+        fresh = {}
+        if missing:
+            encoded = self.similarity_model.encode(
+                missing, batch_size=64, convert_to_numpy=True, normalize_embeddings=True
+            )
+            fresh = dict(zip(missing, encoded))
+            for text, embedding in fresh.items():
+                if len(self._emb_cache) >= self._EMB_CACHE_MAX:
+                    self._emb_cache.pop(next(iter(self._emb_cache)))  # Drop the oldest entry
+                self._emb_cache[text] = embedding
+        # Stack from the fresh batch as well, in case eviction already
+        # displaced an entry encoded for this very call
+        return np.stack([self._emb_cache[text] if text in self._emb_cache else fresh[text]
+                         for text in texts])
+
     def get_entailment_probability(self, premise: str, hypothesis: str) -> float:
         """
         Calculates the probability that the premise entails the hypothesis.
+        Results are memoized on the (premise, hypothesis) pair.
 
         Args:
             premise: The premise string.
@@ -47,14 +261,24 @@ class CORE:
         Returns:
             The probability of entailment (between 0 and 1).
         """
-        # Tokenize input
-        inputs = self.entailment_tokenizer(premise, hypothesis, return_tensors="pt", truncation=True, max_length=512)
-        
+        key = (premise, hypothesis)
+        cached = self._entail_cache.get(key)
+        if cached is not None:
+            return cached
+        result = self._entail(premise, hypothesis)
+        if len(self._entail_cache) >= self._ENTAIL_CACHE_MAX:
+            self._entail_cache.pop(next(iter(self._entail_cache)))  # Drop the oldest entry
+        self._entail_cache[key] = result
+        return result
+
+    def _entail(self, premise: str, hypothesis: str) -> float:
+        # Tokenize input (fixed padded length so the compiled graph is reused)
+        inputs = self.entailment_tokenizer(premise, hypothesis, return_tensors="pt", padding="max_length",
+                                           truncation=True, max_length=self.entailment_max_length)
+
         # Get model predictions
-        with torch.no_grad():
-            outputs = self.entailment_model(**inputs)
-            logits = outputs.logits
-        
+        logits = self._entailment_forward(inputs)
+
         # Convert logits to probabilities
         probabilities = torch.softmax(logits, dim=1).numpy()[0]
 
@@ -73,11 +297,14 @@ class CORE:
         Returns:
             The cosine similarity score (between 0 and 1).
         """
-        embeddings = self.similarity_model.encode([claim1, claim2])
+        embeddings = self._encode_cached([claim1, claim2])
+        if simsimd is not None:
+            # Single SIMD cosine kernel; much faster than the NumPy recipe on short vectors
+            return 1.0 - float(simsimd.cosine(embeddings[0].astype(np.float32), embeddings[1].astype(np.float32)))
         similarity = np.dot(embeddings[0], embeddings[1]) / (np.linalg.norm(embeddings[0]) * np.linalg.norm(embeddings[1]))
         return similarity
     
-    def select_core_subclaims(self, subclaims: List[str], informativeness_weights: List[float], threshold: float = 0.5) -> List[int]:
+    def select_core_subclaims(self, subclaims: List[str], informativeness_weights: List[float], threshold: float = 0.5, binary: bool = False) -> List[int]:
         """
         Selects a subset of subclaims that are unique and informative using a greedy approach.
 
@@ -85,32 +312,92 @@ class CORE:
             subclaims: A list of subclaims.
             informativeness_weights: A list of informativeness weights corresponding to the subclaims.
             threshold: The similarity threshold for considering subclaims as duplicates.
+            binary: If True, dedup with packed binary embeddings and Hamming
+                distance instead of float cosine (~32x less memory per vector).
+
+        Returns:
+            A list of indices of selected subclaims.
+        """
+        if not subclaims:
+            return []
+
+        if binary and quantize_embeddings is not None:
+            return self._select_core_subclaims_binary(subclaims, informativeness_weights, threshold)
+
+        # Encode all subclaims in one batched forward; normalized embeddings make
+        # the dot product equal to cosine similarity, so the greedy dedup check
+        # becomes a single matmul per candidate instead of a Python loop.
+        embeddings = self._encode_cached(subclaims)
+        return self._greedy_select(embeddings, informativeness_weights, threshold)
+
+    def _greedy_select(self, embeddings: np.ndarray, informativeness_weights: List[float], threshold: float) -> List[int]:
+        """
+        Pure-NumPy greedy selection over precomputed normalized embeddings.
+
+        Args:
+            embeddings: A (N, D) array of L2-normalized subclaim embeddings.
+            informativeness_weights: Informativeness weight per subclaim.
+            threshold: The similarity threshold for considering subclaims as duplicates.
+
+        Returns:
+            A list of indices of selected subclaims.
+        """
+        # Visit subclaims by informativeness in descending order
+        sorted_indices = np.argsort(informativeness_weights)[::-1]
+
+        # Preallocate the selected-embedding matrix so each candidate check is a
+        # single GEMV against the filled rows, with no per-candidate stacking
+        selected_indices = []
+        selected_matrix = np.empty(embeddings.shape, dtype=np.float32)
+        n_selected = 0
+
+        for idx in sorted_indices:
+            if n_selected:
+                similarities = selected_matrix[:n_selected] @ embeddings[idx]
+                if float(similarities.max()) > threshold:
+                    continue
+            selected_matrix[n_selected] = embeddings[idx]
+            n_selected += 1
+            selected_indices.append(int(idx))
+
+        return selected_indices
+
+    def _select_core_subclaims_binary(self, subclaims: List[str], informativeness_weights: List[float], threshold: float) -> List[int]:
+        """
+        Greedy selection over binary-quantized embeddings.
+
+        The dedup check only compares similarity against a threshold, so packed
+        sign bits with Hamming distance are enough: each 768-d FP32 vector
+        becomes 96 bytes and each comparison a XOR + popcount.
+
+        Args:
+            subclaims: A list of subclaims.
+            informativeness_weights: A list of informativeness weights corresponding to the subclaims.
+            threshold: The cosine similarity threshold, converted to an
+                equivalent Hamming distance on the packed bits.
 
         Returns:
             A list of indices of selected subclaims.
         """
-        # Pair subclaims with their weights and original indices
-        subclaims_with_weights_and_indices = list(enumerate(zip(subclaims, informativeness_weights)))
-        # Sort subclaims by informativeness in descending order
-        subclaims_sorted = sorted(subclaims_with_weights_and_indices, key=lambda x: x[1][1], reverse=True)
-        
+        embeddings = self._encode_cached(subclaims)
+        packed = quantize_embeddings(embeddings, precision="ubinary").astype(np.uint8)
+        # Cosine above threshold roughly corresponds to fewer than
+        # (1 - threshold) * D differing sign bits
+        max_hamming = int((1.0 - threshold) * embeddings.shape[1])
+
+        sorted_indices = np.argsort(informativeness_weights)[::-1]
         selected_indices = []
-        selected_embeddings = []
-
-        for idx, (subclaim, weight) in subclaims_sorted:
-            is_unique = True
-            embedding = self.similarity_model.encode(subclaim)
-            
-            for selected_embedding in selected_embeddings:
-                similarity = np.dot(embedding, selected_embedding) / (np.linalg.norm(embedding) * np.linalg.norm(selected_embedding))
-                if similarity > threshold:
-                    is_unique = False
-                    break
-
-            if is_unique:
-                selected_embeddings.append(embedding)
-                selected_indices.append(idx)
-        
+        selected_packed = []
+
+        for idx in sorted_indices:
+            if selected_packed:
+                xor = np.bitwise_xor(packed[idx], np.stack(selected_packed))
+                distances = np.unpackbits(xor, axis=1).sum(axis=1)
+                if int(distances.min()) < max_hamming:
+                    continue
+            selected_packed.append(packed[idx])
+            selected_indices.append(int(idx))
+
         return selected_indices
 
     def apply_core(self, subclaims: List[str], bleached_claims: List[str], threshold: float = 0.5) -> List[int]:
@@ -125,6 +412,70 @@ class CORE:
         Returns:
             A list of indices of filtered subclaims.
         """
+        if not subclaims:
+            return []
+        # Two forwards total: one batched similarity encode and one batched
+        # entailment pass; the greedy selection reuses the embedding matrix
+        # directly instead of re-encoding inside select_core_subclaims.
+        embeddings = self._encode_cached(subclaims)
         weights = self.calculate_informativeness_weights(subclaims, bleached_claims)
-        selected_indices = self.select_core_subclaims(subclaims, weights, threshold)
-        return selected_indices
\ No newline at end of file
+        return self._greedy_select(embeddings, weights, threshold)
+
+
+@functools.lru_cache(maxsize=1)
+def get_core(entailment_model_name: str = 'roberta-large-mnli', similarity_model: str = 'all-mpnet-base-v2') -> CORE:
+    """
+    Returns a process-wide CORE instance, loading the heavy models only once.
+
+    Constructing CORE reads ~1.7GB of model weights from disk; callers that
+    score many documents should use this factory instead of instantiating
+    CORE per document so the load cost is amortized across requests.
+
+    Args:
+        entailment_model_name: Name of the entailment model.
+        similarity_model: Name of the similarity model.
+
+    Returns:
+        The shared CORE instance for this process.
+    """
+    return CORE(entailment_model_name, similarity_model)
+
+
+# Worker-local CORE instance for apply_core_parallel; the heavy models are
+# loaded once per worker process and reused across documents.
+_worker_core = None
+
+def _init_core_worker(entailment_model_name: str, similarity_model: str, num_processes: int):
+    global _worker_core
+    # Avoid thread oversubscription when several torch processes share the CPUs
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // num_processes))
+    _worker_core = get_core(entailment_model_name, similarity_model)
+
+def _apply_core_task(args: Tuple[List[str], List[str], float]) -> List[int]:
+    subclaims, bleached_claims, threshold = args
+    return _worker_core.apply_core(subclaims, bleached_claims, threshold)
+
+def apply_core_parallel(documents_subclaims: List[List[str]], bleached_claims: List[str],
+                        threshold: float = 0.5, processes: int = None,
+                        entailment_model_name: str = 'roberta-large-mnli',
+                        similarity_model: str = 'all-mpnet-base-v2') -> List[List[int]]:
+    """
+    Applies the CORE algorithm to many documents in parallel via a process pool.
+
+    Args:
+        documents_subclaims: One list of subclaims per document.
+        bleached_claims: A list of bleached claims for the domain.
+        threshold: The similarity threshold for deduplication.
+        processes: Number of worker processes (defaults to up to 4, capped by CPU count).
+        entailment_model_name: Name of the entailment model for each worker's CORE.
+        similarity_model: Name of the similarity model for each worker's CORE.
+
+    Returns:
+        A list of selected-index lists, one per document, in input order.
+    """
+    processes = processes or max(1, min(4, os.cpu_count() or 1))
+    tasks = [(subclaims, bleached_claims, threshold) for subclaims in documents_subclaims]
+    ctx = multiprocessing.get_context('spawn')  # Avoid forking loaded torch/CUDA state
+    with ctx.Pool(processes=processes, initializer=_init_core_worker,
+                  initargs=(entailment_model_name, similarity_model, processes)) as pool:
+        return pool.map(_apply_core_task, tasks)
\ No newline at end of file
@@ -1,11 +1,102 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import spacy
 from spacy.tokens import Token
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import os
+from typing import List
+from tenacity import AsyncRetrying, stop_after_attempt, wait_random_exponential
+
+from nlp_utils import get_nlp
+
+logger = logging.getLogger(__name__)
+
+# Shared keep-alive session: one TCP+TLS handshake per host instead of one
+# per request, with transport-level retries for transient failures
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                                       max_retries=Retry(total=3, backoff_factor=0.5)))
+
+async def _query_coref_chunk(client, sem, api_url, headers, chunk):
+    """Query the coref endpoint for one chunk, retrying transient failures."""
+    async with sem:
+        async for attempt in AsyncRetrying(stop=stop_after_attempt(3),
+                                           wait=wait_random_exponential(min=1, max=60)):
+            with attempt:
+                response = await client.post(api_url, headers=headers, json={"inputs": chunk})
+                return response.json()
+
+async def _query_coref_chunks(api_url, headers, chunks):
+    """Send all chunk queries concurrently, preserving input order."""
+    sem = asyncio.Semaphore(4)  # Stay within HF rate limits
+    async with httpx.AsyncClient(timeout=300.0) as client:
+        results = await asyncio.gather(
+            *[_query_coref_chunk(client, sem, api_url, headers, chunk) for chunk in chunks],
+            return_exceptions=True
+        )
+    return [{"error": str(result)} if isinstance(result, BaseException) else result
+            for result in results]
+
+# Initialize SpaCy via the shared cached factory; decomposition only reads POS
+# tags and the dependency parse, so ner and the lemmatizer are excluded. The
+# attribute_ruler must stay: in en_core_web_sm it is what maps fine-grained
+# tags to the coarse Token.pos these loops compare against.
+nlp = get_nlp(exclude=("ner", "lemmatizer"))
+
+# Integer symbol ids for the hot dep/pos comparisons. Comparing token.dep /
+# token.pos against ints avoids materializing the .dep_/.pos_ strings from the
+# StringStore on every child visit in the extraction loops.
+_strings = nlp.vocab.strings
+_DEP_ROOT = _strings["ROOT"]
+_DEP_CONJ = _strings["conj"]
+_DEP_PREP = _strings["prep"]
+_DEP_POBJ = _strings["pobj"]
+_DEP_RELCL = _strings["relcl"]
+_POS_VERB = _strings["VERB"]
+_POS_PRON = _strings["PRON"]
+_AUX_DEPS = frozenset((_strings["aux"], _strings["auxpass"]))
+_SUBJECT_DEPS = frozenset((_strings["nsubj"], _strings["nsubjpass"]))
+_MODIFIER_DEPS = frozenset((_strings["det"], _strings["amod"], _strings["compound"], _strings["appos"]))
+_OBJECT_DEPS = frozenset((_strings["dobj"], _strings["attr"], _strings["oprd"], _strings["iobj"]))
+_NOMINAL_POS = frozenset((_strings["NOUN"], _strings["PROPN"], _strings["ADJ"], _strings["PRON"]))
+
+# Cheap pre-filter before the remote coref endpoint: sentences with no
+# personal pronoun (or too short to hold one plus an antecedent) cannot
+# benefit from resolution, so they skip the round-trip entirely
+_PRONOUN_GATE = re.compile(r"\b(he|she|it|they|him|her|them|his|hers|its|their|theirs)\b",
+                           re.IGNORECASE)
+
+def _needs_coref(sentence):
+    return len(sentence) >= 12 and _PRONOUN_GATE.search(sentence) is not None
+
+# Precompiled string-normalization helpers for the per-fact hot path
+_TRAIL = re.compile(r'[,;]+\s*$')
+_AND_SPLIT = re.compile(r'\s+and\s+')
+
+@functools.lru_cache(maxsize=2048)
+def _parse(text):
+    """
+    Parse text with the shared spaCy pipeline, memoizing the resulting Doc.
+
+    Repeated sentences parse once, and when coreference resolution leaves a
+    sentence unchanged the second parse in decompose_sentence is a cache hit.
 
-# Initialize SpaCy
-nlp = spacy.load("en_core_web_sm")
+    Args:
+        text (str): The text to parse.
+
+    Returns:
+        spacy.tokens.Doc: The parsed document.
+    """
+    return nlp(text)
 
 def long_coref_resolution(text):
     """
@@ -22,20 +113,32 @@ def long_coref_resolution(text):
 
     def query(payload):
         data = json.dumps(payload)
-        response = requests.post(API_URL, headers=headers, data=data, timeout=300)
+        response = _session.post(API_URL, headers=headers, data=data, timeout=300)
         return response.json()
 
     # Split the text into smaller chunks for processing
-    doc = nlp(text)
-    sentences = [sent.text for sent in doc.sents]
-    
+    doc = _parse(text)
+
+    # Nothing to resolve without pronouns (common for factual subclaims);
+    # skip the remote model entirely
+    if not any(token.pos == _POS_PRON for token in doc):
+        return text
+
+    # Sentence text plus token count straight from the parsed spans; the doc is
+    # already tokenized, so no per-sentence re-parse is needed just to count
+    sentences = [(sent.text, len(sent)) for sent in doc.sents]
+
+    # A single sentence has no cross-sentence antecedents for the model to
+    # resolve, so the remote call cannot improve it
+    if len(sentences) <= 1:
+        return text
+
     # Ensure not to exceed model's maximum token limit
     max_length = 512  # Adjust based on the model's limit
     chunks = []
     current_chunk = []
     current_length = 0
-    for sentence in sentences:
-        sentence_length = len(nlp(sentence))  # Count tokens in the sentence
+    for sentence, sentence_length in sentences:
         if current_length + sentence_length < max_length:
             current_chunk.append(sentence)
             current_length += sentence_length
@@ -46,47 +149,81 @@ def long_coref_resolution(text):
     if current_chunk:
         chunks.append(" ".join(current_chunk))  # Add the last chunk
 
-    resolved_text = ""
-    for chunk in chunks:
-        output = query({"inputs": chunk})
-        
+    # Independent chunks of one document are resolved concurrently, so the
+    # document-level latency is max(chunk_time) rather than the sum
+    if len(chunks) > 1:
+        outputs = asyncio.run(_query_coref_chunks(API_URL, headers, chunks))
+    else:
+        outputs = [query({"inputs": chunk}) for chunk in chunks]
+
+    # Collect resolved pieces and join once at the end; repeated string
+    # concatenation re-copies the accumulated text on every chunk
+    resolved_parts = []
+    for chunk, output in zip(chunks, outputs):
         # Check for errors in the response
         if "error" in output:
-            print(f"Error processing chunk: {output['error']}")
-            resolved_text += chunk  # Append the original chunk if error occurs
+            logger.warning("Error processing chunk: %s", output['error'])
+            resolved_parts.append(chunk)  # Keep the original chunk if error occurs
             continue
-        
+
         # Extract resolved text from the output
-        resolved_text += output.get("resolved_text", chunk)
+        resolved_parts.append(output.get("resolved_text", chunk))
 
-    return resolved_text
+    return "".join(resolved_parts)
 
-def get_full_object(token):
+def get_full_object(token, cache=None):
     """
-    Recursively get the full object phrase, including prepositional phrases and modifiers.
+    Get the full object phrase, including prepositional phrases and modifiers.
+
+    Walks nested prepositional objects with an explicit stack instead of
+    recursion, evaluating each subtree bottom-up; deep PP chains cost no
+    Python call frames.
 
     Args:
         token (spacy.Token): The object token.
+        cache (dict, optional): token.i -> phrase memo shared across calls on
+            the same Doc, so subtrees reached from several verbs resolve once.
 
     Returns:
         str: The full object phrase.
     """
-    obj_phrase = token.text
-    # Include compound nouns, adjectival modifiers, determiners, and appositives
-    modifiers = [child.text for child in token.lefts if child.dep_ in ('compound', 'amod', 'det', 'appos')]
-    if modifiers:
-        obj_phrase = ' '.join(modifiers) + ' ' + obj_phrase
-
-    # Include prepositional phrases
-    preps = [child for child in token.children if child.dep_ == 'prep']
-    for prep in preps:
-        prep_phrase = prep.text
-        for pobj in prep.children:
-            if pobj.dep_ == 'pobj' and pobj.pos_ in ('NOUN', 'PROPN', 'ADJ', 'PRON'):
-                prep_obj = get_full_object(pobj)
-                prep_phrase += f" {prep_obj}"
-                obj_phrase += f" {prep_phrase}"
-    return obj_phrase
+    phrases = cache if cache is not None else {}  # token.i -> completed phrase
+    if token.i in phrases:
+        return phrases[token.i]
+    stack = [(token, False)]
+    while stack:
+        tok, children_done = stack.pop()
+        if not children_done:
+            # Revisit this token after its prepositional objects are resolved
+            stack.append((tok, True))
+            for prep in tok.children:
+                if prep.dep == _DEP_PREP:
+                    for pobj in prep.children:
+                        if pobj.dep == _DEP_POBJ and pobj.pos in _NOMINAL_POS and pobj.i not in phrases:
+                            stack.append((pobj, False))
+            continue
+
+        # Include compound nouns, adjectival modifiers, determiners, and
+        # appositives; collect into one list and join once rather than
+        # building a throwaway list plus a second concatenation
+        parts = []
+        for child in tok.lefts:
+            if child.dep in _MODIFIER_DEPS:
+                parts.append(child.text)
+        parts.append(tok.text)
+        obj_phrase = ' '.join(parts)
+
+        # Include prepositional phrases (nested objects already resolved)
+        for prep in tok.children:
+            if prep.dep == _DEP_PREP:
+                prep_phrase = prep.text
+                for pobj in prep.children:
+                    if pobj.dep == _DEP_POBJ and pobj.pos in _NOMINAL_POS:
+                        prep_phrase += f" {phrases[pobj.i]}"
+                        obj_phrase += f" {prep_phrase}"
+        phrases[tok.i] = obj_phrase
+
+    return phrases[token.i]
 
 def remove_trailing_punctuation(s):
     """
@@ -98,9 +235,7 @@ def remove_trailing_punctuation(s):
     Returns:
         str: The string with trailing punctuation removed.
     """
-    if s and s[-1] in [',', ';']:
-        return s[:-1].strip()
-    return s
+    return _TRAIL.sub('', s)
 
 def decompose_sentence(sentence: str) -> List[str]:
     """
@@ -115,81 +250,104 @@ def decompose_sentence(sentence: str) -> List[str]:
               Returns an empty list if decomposition isn't possible.
     """
     try:
-        # Resolve coreferences using long-coref model
-        resolved_text = long_coref_resolution(sentence)
-        resolved_doc = nlp(resolved_text)
+        # Resolve coreferences using long-coref model; when the resolved text is
+        # unchanged this re-parse is a cache hit from long_coref_resolution's parse
+        resolved_text = long_coref_resolution(sentence) if _needs_coref(sentence) else sentence
+        resolved_doc = _parse(resolved_text)
     except Exception as e:
-        print(f"Error resolving coreferences in sentence: {e}")
+        logger.error("Error resolving coreferences in sentence: %s", e)
         return []
 
+    return _decompose_doc(resolved_doc)
+
+def decompose_sentences(sentences: List[str]) -> List[List[str]]:
+    """
+    Decompose many sentences at once, batching the spaCy parses through nlp.pipe.
+
+    Args:
+        sentences (List[str]): The sentences to decompose.
+
+    Returns:
+        list: One list of numbered atomic facts per input sentence, in order.
+    """
+    resolved_texts = []
+    for sentence in sentences:
+        try:
+            resolved_texts.append(long_coref_resolution(sentence) if _needs_coref(sentence) else sentence)
+        except Exception as e:
+            logger.error("Error resolving coreferences in sentence: %s", e)
+            resolved_texts.append(None)
+
+    results = [[] for _ in sentences]
+    to_parse = [(i, text) for i, text in enumerate(resolved_texts) if text is not None]
+    # One batched pass through the pipeline instead of a per-sentence nlp() call
+    docs = nlp.pipe((text for _, text in to_parse), batch_size=64)
+    for (i, _), resolved_doc in zip(to_parse, docs):
+        results[i] = _decompose_doc(resolved_doc)
+    return results
+
+def decompose_sentences_parallel(sentences: List[str], max_workers: int = None,
+                                 chunksize: int = 8) -> List[List[str]]:
+    """
+    Decompose many sentences across worker processes.
+
+    Parsing is CPU-bound, so independent sentences scale with core count.
+    Workers are started with the spawn context: each one imports this module
+    fresh and loads its own spaCy model lazily, instead of forking a parent
+    that already holds a loaded model.
+
+    Args:
+        sentences (List[str]): The sentences to decompose.
+        max_workers (int): Worker process count; defaults to os.cpu_count().
+        chunksize (int): Sentences handed to a worker per task.
+
+    Returns:
+        list: One list of numbered atomic facts per input sentence, in order.
+    """
+    if len(sentences) <= 1:
+        return decompose_sentences(sentences)
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                             mp_context=ctx) as executor:
+        return list(executor.map(decompose_sentence, sentences, chunksize=chunksize))
+
+def _decompose_doc(resolved_doc) -> List[str]:
+    """
+    Extract numbered atomic facts from an already-parsed, coref-resolved Doc.
+
+    Args:
+        resolved_doc (spacy.tokens.Doc): The parsed document.
+
+    Returns:
+        list: A numbered list of atomic facts extracted from the document.
+    """
     facts = []
     current_subject = None
+    # Shared per-document memo for get_full_object; token indices are unique
+    # within one Doc, so subtrees reused across verbs resolve only once
+    object_cache = {}
 
     for sent in resolved_doc.sents:
-        has_root = any(token.dep_ == "ROOT" and token.pos_ == "VERB" for token in sent)
+        has_root = any(token.dep == _DEP_ROOT and token.pos == _POS_VERB for token in sent)
         if not has_root:
-            print(f"Skipping sentence with no main verb: {sent.text}")
+            logger.debug("Skipping sentence with no main verb: %s", sent.text)
             continue
 
         for token in sent:
-            if token.pos_ == "VERB" and token.dep_ in ("ROOT", "conj"):
-                verb_main = token.text
-                verb_aux = ' '.join([child.text for child in token.children if child.dep_ in ('aux', 'auxpass')])
-                full_verb = f"{verb_aux} {verb_main}".strip() if verb_aux else verb_main
-
-                subject = next((child.text for child in token.children if child.dep_ in ('nsubj', 'nsubjpass')), None)
-                if subject:
-                    subject_modifiers = [w.text for w in token.children if w.dep_ in ('det', 'amod', 'compound', 'appos')]
-                    subject = ' '.join(subject_modifiers + [subject])
-                else:
-                    subject = current_subject
-
+            if token.pos == _POS_VERB and token.dep in (_DEP_ROOT, _DEP_CONJ):
+                fact, subject = _extract_verb_fact(token, current_subject, facts, object_cache)
                 if subject:
                     current_subject = subject
-
-                direct_objects = [get_full_object(child) for child in token.children if child.dep_ in ('dobj', 'attr', 'oprd', 'iobj')]
-                prepositional_objects = [f"{child.text.capitalize()} {get_full_object(pobj)}"
-                                         for child in token.children if child.dep_ == 'prep'
-                                         for pobj in child.children if pobj.dep_ == 'pobj' and pobj.pos_ in ('NOUN', 'PROPN', 'ADJ', 'PRON')]
-
-                # Handle relative clauses attached to the main verb's object
-                for child in token.children:
-                    if child.dep_ == 'relcl':
-                        relative_fact = decompose_relative_clause(child)
-                        if relative_fact:
-                            facts.append(relative_fact)
-
-                # Add main verb fact
-                if subject and full_verb:
-                    fact = {
-                        "subject": subject.strip(','),
-                        "verb": full_verb.lower(),
-                        "direct_object": ', '.join(direct_objects).capitalize() if direct_objects else "",
-                        "prepositional_objects": prepositional_objects if prepositional_objects else []
-                    }
-                    if fact["subject"] and fact["verb"]:
-                        facts.append(fact)
+                if fact:
+                    facts.append(fact)
 
                 # Handle conjunct verbs sharing the same subject
                 for conj in token.conjuncts:
-                    if conj.pos_ != "VERB":
+                    if conj.pos != _POS_VERB:
                         continue
-                    conj_verb = conj.text
-                    conj_aux = ' '.join([child.text for child in conj.children if child.dep_ in ('aux', 'auxpass')])
-                    full_conj_verb = f"{conj_aux} {conj_verb}".strip() if conj_aux else conj_verb
-
-                    conj_direct_objects = [get_full_object(child) for child in conj.children if child.dep_ in ('dobj', 'attr', 'oprd', 'iobj')]
-                    conj_prepositional_objects = [f"{child.text.capitalize()} {get_full_object(pobj)}" for child in conj.children if child.dep_ == 'prep' for pobj in child.children if pobj.dep_ == 'pobj' and pobj.pos_ in ('NOUN', 'PROPN', 'ADJ', 'PRON')]
-
-                    if subject and full_conj_verb:
-                        conj_fact = {
-                            "subject": subject.strip(','),
-                            "verb": full_conj_verb.lower(),
-                            "direct_object": ', '.join(conj_direct_objects).capitalize() if conj_direct_objects else "",
-                            "prepositional_objects": conj_prepositional_objects if conj_prepositional_objects else []
-                        }
-                        if conj_fact["subject"] and conj_fact["verb"]:
-                            facts.append(conj_fact)
+                    conj_fact, _ = _extract_verb_fact(conj, subject, facts, object_cache)
+                    if conj_fact:
+                        facts.append(conj_fact)
 
     # Post-processing for enhanced atomicity
     atomic_facts = []
@@ -201,30 +359,113 @@ def decompose_sentence(sentence: str) -> List[str]:
 
     return numbered_facts
 
-def decompose_relative_clause(token):
+def _extract_verb_fact(token, inherited_subject, facts, cache=None):
+    """
+    Build the fact for one verb with a single pass over its children.
+
+    Buckets every child by dependency label once instead of re-walking
+    token.children separately for auxiliaries, subject, objects,
+    prepositional phrases and relative clauses.
+
+    Args:
+        token (spacy.Token): The verb token.
+        inherited_subject (str): Subject carried over from a previous verb,
+            used when this verb has no subject of its own.
+        facts (list): Output list; facts from attached relative clauses are
+            appended here directly.
+        cache (dict, optional): Per-document get_full_object memo.
+
+    Returns:
+        tuple: (fact dict or None, the subject string used or None).
+    """
+    aux_parts = []
+    subject_token = None
+    subject_modifiers = []
+    direct_objects = []
+    prepositional_objects = []
+    relative_clauses = []
+
+    for child in token.children:
+        dep = child.dep
+        if dep in _AUX_DEPS:
+            aux_parts.append(child.text)
+        elif dep in _SUBJECT_DEPS:
+            if subject_token is None:
+                subject_token = child
+        elif dep in _MODIFIER_DEPS:
+            subject_modifiers.append(child.text)
+        elif dep in _OBJECT_DEPS:
+            direct_objects.append(get_full_object(child, cache))
+        elif dep == _DEP_PREP:
+            for pobj in child.children:
+                if pobj.dep == _DEP_POBJ and pobj.pos in _NOMINAL_POS:
+                    prepositional_objects.append(f"{child.text.capitalize()} {get_full_object(pobj, cache)}")
+        elif dep == _DEP_RELCL:
+            relative_clauses.append(child)
+
+    # Relative clauses attached to the verb produce their own facts
+    for relcl in relative_clauses:
+        relative_fact = decompose_relative_clause(relcl, cache)
+        if relative_fact:
+            facts.append(relative_fact)
+
+    aux_parts.append(token.text)
+    full_verb = ' '.join(aux_parts)
+
+    if subject_token is not None:
+        subject_modifiers.append(subject_token.text)
+        subject = ' '.join(subject_modifiers)
+    else:
+        subject = inherited_subject
+
+    if not (subject and full_verb):
+        return None, subject
+
+    fact = {
+        "subject": subject.strip(','),
+        "verb": full_verb.lower(),
+        "direct_object": ', '.join(direct_objects).capitalize() if direct_objects else "",
+        "prepositional_objects": prepositional_objects if prepositional_objects else []
+    }
+    if fact["subject"] and fact["verb"]:
+        return fact, subject
+    return None, subject
+
+def decompose_relative_clause(token, cache=None):
     """
     Extract facts from a relative clause.
 
     Args:
         token (spacy.Token): The token representing the relative clause.
+        cache (dict, optional): Per-document get_full_object memo.
 
     Returns:
         dict: A dictionary representing the extracted fact, or None if no fact is found.
     """
     relative_verb = token.text
     relative_subject = None
+    relative_direct_objects = []
+    relative_prepositional_objects = []
+    # One walk over the children, bucketed by dep, instead of a subject scan
+    # followed by separate object/prep comprehensions
     for rel_child in token.children:
-        if rel_child.dep_ in ('nsubj', 'nsubjpass'):
-            relative_subject = rel_child.text
-            rel_modifiers = [w.text for w in rel_child.lefts if w.dep_ in ('det', 'amod', 'compound', 'appos')]
-            if rel_modifiers:
-                relative_subject = ' '.join(rel_modifiers + [relative_subject])
-            break
+        dep = rel_child.dep
+        if dep in _SUBJECT_DEPS:
+            if relative_subject is None:
+                rel_parts = []
+                for w in rel_child.lefts:
+                    if w.dep in _MODIFIER_DEPS:
+                        rel_parts.append(w.text)
+                rel_parts.append(rel_child.text)
+                relative_subject = ' '.join(rel_parts)
+        elif dep in _OBJECT_DEPS:
+            relative_direct_objects.append(get_full_object(rel_child, cache))
+        elif dep == _DEP_PREP:
+            for rel_pobj in rel_child.children:
+                if rel_pobj.dep == _DEP_POBJ and rel_pobj.pos in _NOMINAL_POS:
+                    relative_prepositional_objects.append(f"{rel_child.text.capitalize()} {get_full_object(rel_pobj, cache)}")
 
     if relative_subject:
-        relative_direct_objects = [get_full_object(rel_child) for rel_child in token.children if rel_child.dep_ in ('dobj', 'attr', 'oprd', 'iobj')]
-        relative_prepositional_objects = [f"{rel_child.text.capitalize()} {get_full_object(rel_pobj)}" for rel_child in token.children if rel_child.dep_ == 'prep' for rel_pobj in rel_child.children if rel_pobj.dep_ == 'pobj' and rel_pobj.pos_ in ('NOUN', 'PROPN', 'ADJ', 'PRON')]
-
         relative_fact = {
             "subject": relative_subject.strip(','),
             "verb": relative_verb.lower(),
@@ -247,61 +488,90 @@ def split_complex_fact(fact, doc):
         list: A list of atomic fact dictionaries.
     """
     atomic_facts = []
-    
-    # Check for conjunctions in the direct object
-    if ' and ' in fact.get('direct_object', ''):
-        parts = fact['direct_object'].split(' and ')
-        for part in parts:
-            new_fact = fact.copy()
-            new_fact['direct_object'] = part.strip()
-            atomic_facts.extend(split_complex_fact(new_fact, doc))  # Recursive call to handle further splitting
-        return atomic_facts
-
-    # Check for conjunctions in prepositional objects
-    prepositional_objects = fact.get('prepositional_objects', [])
-    if prepositional_objects:
-        new_prepositional_objects = []
-        for prep_obj in prepositional_objects:
-            if ' and ' in prep_obj:
-                parts = prep_obj.split(' and ')
-                for part in parts:
-                    new_prepositional_objects.append(part.strip())
-            else:
-                new_prepositional_objects.append(prep_obj)
-        if new_prepositional_objects != prepositional_objects:
-            new_fact = fact.copy()
-            new_fact['prepositional_objects'] = new_prepositional_objects
-            atomic_facts.extend(split_complex_fact(new_fact, doc))  # Recursive call to handle further splitting
-            return atomic_facts
+    # Iterative worklist instead of recursion: each conjunction split re-enters
+    # the queue, so a fact with k conjunctions costs O(k) shallow dict copies
+    # rather than O(k^2) copies across recursion levels
+    pending = deque([fact])
+    while pending:
+        fact = pending.popleft()
+
+        # Check for conjunctions in the direct object
+        direct_object = fact.get('direct_object', '')
+        if ' and ' in direct_object:
+            pending.extend({**fact, 'direct_object': part.strip()} for part in _AND_SPLIT.split(direct_object))
+            continue
+
+        # Check for conjunctions in prepositional objects
+        prepositional_objects = fact.get('prepositional_objects', [])
+        if prepositional_objects:
+            new_prepositional_objects = []
+            for prep_obj in prepositional_objects:
+                if ' and ' in prep_obj:
+                    new_prepositional_objects.extend(part.strip() for part in _AND_SPLIT.split(prep_obj))
+                else:
+                    new_prepositional_objects.append(prep_obj)
+            if new_prepositional_objects != prepositional_objects:
+                pending.append({**fact, 'prepositional_objects': new_prepositional_objects})
+                continue
 
+        atomic_facts.extend(_split_relative_clause(fact, doc))
+
+    return atomic_facts
+
+def _split_relative_clause(fact, doc):
+    """
+    Splits a relative clause out of a fact's direct object, if present.
+
+    Args:
+        fact (dict): A conjunction-free fact dictionary.
+        doc (spacy.Doc): The SpaCy document for the original sentence.
+
+    Returns:
+        list: The resulting atomic fact dictionaries.
+    """
+    atomic_facts = []
     # Check for relative clauses in direct object
     if ' that ' in fact.get('direct_object', '') or ' which ' in fact.get('direct_object', ''):
         parts = fact['direct_object'].split(' that ')
         main_object = parts[0].strip()
         if len(parts) > 1:
             relative_clause = 'that ' + ' that '.join(parts[1:])
-            relative_doc = nlp(relative_clause)
-            for token in relative_doc:
-                if token.pos_ == "VERB" and token.dep_ == "ROOT":
+            # The clause was already parsed as part of doc; locate its span by
+            # character offset instead of re-running the full pipeline on the
+            # fragment. Inside the original parse the clause verb carries the
+            # relcl dep rather than ROOT.
+            start = doc.text.find(relative_clause)
+            span = doc.char_span(start, start + len(relative_clause)) if start != -1 else None
+            if span is not None:
+                clause_tokens = span
+                verb_deps = (_DEP_RELCL, _DEP_ROOT)
+            else:
+                # Fact text was rebuilt from token pieces and no longer matches
+                # the document verbatim; fall back to a fresh parse
+                clause_tokens = nlp(relative_clause)
+                verb_deps = (_DEP_ROOT,)
+            for token in clause_tokens:
+                if token.pos == _POS_VERB and token.dep in verb_deps:
                     relative_subject = None
-                    for child in token.children:
-                        if child.dep_ in ('nsubj', 'nsubjpass'):
-                            relative_subject = child.text
-                            rel_modifiers = [w.text for w in child.lefts if w.dep_ in ('det', 'amod', 'compound', 'appos')]
-                            if rel_modifiers:
-                                relative_subject = ' '.join(rel_modifiers + [relative_subject])
-                            break
                     relative_direct_objects = []
                     relative_prepositional_objects = []
+                    # Same single-pass bucketing as decompose_relative_clause
                     for rel_child in token.children:
-                        if rel_child.dep_ in ('dobj', 'attr', 'oprd', 'iobj'):
-                            obj = get_full_object(rel_child)
-                            relative_direct_objects.append(obj)
-                        elif rel_child.dep_ == 'prep':
+                        dep = rel_child.dep
+                        if dep in _SUBJECT_DEPS:
+                            if relative_subject is None:
+                                rel_parts = []
+                                for w in rel_child.lefts:
+                                    if w.dep in _MODIFIER_DEPS:
+                                        rel_parts.append(w.text)
+                                rel_parts.append(rel_child.text)
+                                relative_subject = ' '.join(rel_parts)
+                        elif dep in _OBJECT_DEPS:
+                            relative_direct_objects.append(get_full_object(rel_child))
+                        elif dep == _DEP_PREP:
                             for rel_pobj in rel_child.children:
-                                if rel_pobj.dep_ == 'pobj' and rel_pobj.pos_ in ('NOUN', 'PROPN', 'ADJ', 'PRON'):
-                                    prep_obj = get_full_object(rel_pobj)
-                                    relative_prepositional_objects.append(f"{rel_child.text.capitalize()} {prep_obj}")
+                                if rel_pobj.dep == _DEP_POBJ and rel_pobj.pos in _NOMINAL_POS:
+                                    relative_prepositional_objects.append(f"{rel_child.text.capitalize()} {get_full_object(rel_pobj)}")
                     if relative_subject:
                         relative_fact = {
                             "subject": relative_subject.strip(','),
@@ -328,15 +598,10 @@ def format_fact(fact):
     Returns:
         str: A formatted string representing the fact.
     """
-    subject = fact.get("subject", "")
-    verb = fact.get("verb", "")
-    direct_object = fact.get("direct_object", "")
-    prepositional_objects = fact.get("prepositional_objects", [])
-
-    fact_str = f"{subject} {verb}"
-    if direct_object:
-        fact_str += f" {direct_object}"
-    if prepositional_objects:
-        fact_str += f" {' '.join(prepositional_objects)}"
-
-    return fact_str.strip()
\ No newline at end of file
+    # Join the non-empty parts once instead of growing the string per branch
+    return ' '.join(filter(None, (
+        fact.get("subject", ""),
+        fact.get("verb", ""),
+        fact.get("direct_object", ""),
+        ' '.join(fact.get("prepositional_objects", [])),
+    ))).strip()
\ No newline at end of file
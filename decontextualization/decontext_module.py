@@ -1,30 +1,42 @@
 # decontextualization/decontext_module.py
 
+import asyncio
 import os
 import json
+import re
+import httpx
 import requests
-from tenacity import retry, stop_after_attempt, wait_random_exponential
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import List, Tuple
+from tenacity import AsyncRetrying, RetryError, retry, stop_after_attempt, wait_random_exponential
+
+from nlp_utils import get_nlp
 
 API_URL = os.environ.get("GROQ_API_ENDPOINT")
 API_KEY = os.environ.get("GROQ_API_KEY")
 
-@retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=60))
-def decontextualize_with_llama3(subclaim: str, context: str) -> str:
+# Shared keep-alive session: one TCP+TLS handshake per host instead of one
+# per request, with transport-level retries for transient failures
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                                       max_retries=Retry(total=3, backoff_factor=0.5)))
+
+# Minimal SpaCy pipeline for the fallback path: it only reads doc.ents, so
+# keep ner but exclude the components whose outputs are never used
+nlp = get_nlp(exclude=("lemmatizer", "attribute_ruler"))
+
+def _build_payload(subclaim: str, context: str) -> dict:
     """
-    Decontextualizes a subclaim using the Llama 3 8B model via the Groq API.
+    Builds the Groq chat-completion payload for one decontextualization request.
 
     Args:
         subclaim: The subclaim to decontextualize.
         context: The original sentence containing the subclaim.
 
     Returns:
-        The decontextualized subclaim.
+        The request body dict.
     """
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json"
-    }
-
     messages = [
         {
             "role": "system",
@@ -36,7 +48,7 @@ def decontextualize_with_llama3(subclaim: str, context: str) -> str:
         }
     ]
 
-    data = {
+    return {
         "model": "llama3-8b-8192",
         "messages": messages,
         "max_tokens": 100,
@@ -45,8 +57,52 @@ def decontextualize_with_llama3(subclaim: str, context: str) -> str:
         "stop": ["\n"]
     }
 
+# Process-lifetime cache of decontextualization results keyed on
+# (subclaim, context). A plain dict (rather than lru_cache) so the sync and
+# async paths share it; the event loop is single-threaded so no lock is needed.
+_DECONTEXT_CACHE = {}
+_DECONTEXT_CACHE_MAX = 4096
+
+def _cache_put(key: Tuple[str, str], value: str) -> None:
+    if len(_DECONTEXT_CACHE) >= _DECONTEXT_CACHE_MAX:
+        _DECONTEXT_CACHE.pop(next(iter(_DECONTEXT_CACHE)))  # Drop the oldest entry
+    _DECONTEXT_CACHE[key] = value
+
+def decontextualize_with_llama3(subclaim: str, context: str) -> str:
+    """
+    Decontextualizes a subclaim using the Llama 3 8B model via the Groq API.
+    Results are cached for the life of the process, so repeated
+    (subclaim, context) pairs skip the paid API round-trip.
+
+    Args:
+        subclaim: The subclaim to decontextualize.
+        context: The original sentence containing the subclaim.
+
+    Returns:
+        The decontextualized subclaim.
+    """
+    key = (subclaim, context)
+    cached = _DECONTEXT_CACHE.get(key)
+    if cached is not None:
+        return cached
+    result = _decontextualize_with_llama3_uncached(subclaim, context)
+    if result is None:
+        # Transient failure: fall back without caching, so a later call retries
+        return subclaim
+    _cache_put(key, result)
+    return result
+
+@retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=60))
+def _decontextualize_with_llama3_uncached(subclaim: str, context: str) -> str:
+    headers = {
+        "Authorization": f"Bearer {API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+    data = _build_payload(subclaim, context)
+
     try:
-        response = requests.post(API_URL, headers=headers, data=json.dumps(data))
+        response = _session.post(API_URL, headers=headers, data=json.dumps(data))
         response.raise_for_status()
         response_json = response.json()
 
@@ -55,18 +111,219 @@ def decontextualize_with_llama3(subclaim: str, context: str) -> str:
             return decontextualized_claim
         else:
             print(f"Unexpected response format: {response_json}")
-            return subclaim
+            return None
 
     except requests.exceptions.RequestException as e:
         print(f"Request error: {e}")
-        return subclaim  # Fallback: return the original subclaim
+        return None  # Signal failure; the caller falls back uncached
     except (KeyError, IndexError) as e:
         print(f"Error in parsing response: {e}")
-        return subclaim  # Fallback: return the original subclaim
+        return None  # Signal failure; the caller falls back uncached
     except Exception as e:
         print(f"Unexpected error during decontextualization with Llama 3: {e}")
+        return None  # Signal failure; the caller falls back uncached
+
+async def decontextualize_with_llama3_async(subclaim: str, context: str,
+                                            client: "httpx.AsyncClient",
+                                            sem: "asyncio.Semaphore") -> str:
+    """
+    Async variant of decontextualize_with_llama3 for concurrent batch use.
+
+    Args:
+        subclaim: The subclaim to decontextualize.
+        context: The original sentence containing the subclaim.
+        client: A shared httpx.AsyncClient.
+        sem: Semaphore bounding concurrent requests to the Groq API.
+
+    Returns:
+        The decontextualized subclaim (the original subclaim on failure).
+    """
+    key = (subclaim, context)
+    cached = _DECONTEXT_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    headers = {
+        "Authorization": f"Bearer {API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+    async with sem:
+        try:
+            async for attempt in AsyncRetrying(stop=stop_after_attempt(3),
+                                               wait=wait_random_exponential(min=1, max=60)):
+                with attempt:
+                    response = await client.post(API_URL, headers=headers, json=_build_payload(subclaim, context))
+                    response.raise_for_status()
+                    response_json = response.json()
+
+                    if 'choices' in response_json and response_json['choices'] and 'message' in response_json['choices'][0]:
+                        result = response_json['choices'][0]['message']['content'].strip()
+                        _cache_put(key, result)
+                        return result
+
+                    print(f"Unexpected response format: {response_json}")
+                    return subclaim
+        except RetryError as e:
+            print(f"Request error during async decontextualization: {e}")
+        except Exception as e:
+            print(f"Unexpected error during async decontextualization with Llama 3: {e}")
         return subclaim  # Fallback: return the original subclaim
 
+async def _gather_decontext(pairs: List[Tuple[str, str]], max_concurrent: int) -> List[str]:
+    sem = asyncio.Semaphore(max_concurrent)
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        tasks = [decontextualize_with_llama3_async(subclaim, context, client, sem)
+                 for subclaim, context in pairs]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    return [pair[0] if isinstance(result, BaseException) else result
+            for pair, result in zip(pairs, results)]
+
+def decontextualize_many(pairs: List[Tuple[str, str]], max_concurrent: int = 16) -> List[str]:
+    """
+    Decontextualizes many (subclaim, context) pairs concurrently.
+
+    All Groq requests are issued in parallel (bounded by max_concurrent), so
+    the stage costs roughly one round-trip instead of one per subclaim.
+
+    Args:
+        pairs: A list of (subclaim, context) tuples.
+        max_concurrent: Maximum number of in-flight requests.
+
+    Returns:
+        The decontextualized subclaims, aligned with the input pairs.
+    """
+    if not pairs:
+        return []
+    return asyncio.run(_gather_decontext(pairs, max_concurrent))
+
+# Matches "1. decontextualized text" style lines in batch responses
+_BATCH_LINE_RE = re.compile(r'\s*(\d+)[.):]\s*(.*)')
+
+def _build_batch_payload(pairs: List[Tuple[str, str]]) -> dict:
+    """
+    Builds a single Groq payload decontextualizing several subclaims at once.
+
+    Args:
+        pairs: A list of (subclaim, context) tuples.
+
+    Returns:
+        The request body dict.
+    """
+    numbered = "\n".join(
+        f"{i}. Context: {context}\n   Subclaim: {subclaim}"
+        for i, (subclaim, context) in enumerate(pairs, 1)
+    )
+    messages = [
+        {
+            "role": "system",
+            "content": "You are a helpful assistant. For each numbered (Context, Subclaim) pair, decontextualize the subclaim to make it standalone, ensuring grammatical correctness and maintaining the original meaning. Return one line per pair, prefixed by its number."
+        },
+        {
+            "role": "user",
+            "content": f"{numbered}\n\nDecontextualize each subclaim."
+        }
+    ]
+
+    return {
+        "model": "llama3-8b-8192",
+        "messages": messages,
+        "max_tokens": 100 * len(pairs),
+        "temperature": 0.3,
+        "n": 1
+    }
+
+def _parse_batch_response(content: str, pairs: List[Tuple[str, str]]) -> List[str]:
+    """Maps numbered response lines back onto the input pairs, falling back to
+    the original subclaim for any index the model did not return."""
+    parsed = [None] * len(pairs)
+    for line in content.splitlines():
+        match = _BATCH_LINE_RE.match(line)
+        if match:
+            idx = int(match.group(1)) - 1
+            text = match.group(2).strip()
+            if 0 <= idx < len(pairs) and text:
+                parsed[idx] = text
+
+    results = []
+    for (subclaim, context), result in zip(pairs, parsed):
+        if result is None:
+            result = subclaim
+        else:
+            _cache_put((subclaim, context), result)
+        results.append(result)
+    return results
+
+async def _decontextualize_group_async(pairs: List[Tuple[str, str]], client, sem) -> List[str]:
+    headers = {
+        "Authorization": f"Bearer {API_KEY}",
+        "Content-Type": "application/json"
+    }
+    async with sem:
+        try:
+            async for attempt in AsyncRetrying(stop=stop_after_attempt(3),
+                                               wait=wait_random_exponential(min=1, max=60)):
+                with attempt:
+                    response = await client.post(API_URL, headers=headers, json=_build_batch_payload(pairs))
+                    response.raise_for_status()
+                    content = response.json()['choices'][0]['message']['content']
+                    return _parse_batch_response(content, pairs)
+        except Exception as e:
+            print(f"Batch decontextualization failed, keeping original subclaims: {e}")
+            return [subclaim for subclaim, _ in pairs]
+
+async def _gather_decontext_batches(groups: List[List[Tuple[str, str]]], max_concurrent: int) -> List[List[str]]:
+    sem = asyncio.Semaphore(max_concurrent)
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        return list(await asyncio.gather(
+            *[_decontextualize_group_async(group, client, sem) for group in groups]
+        ))
+
+def decontextualize_batch(pairs: List[Tuple[str, str]], group_size: int = 10,
+                          max_concurrent: int = 16) -> List[str]:
+    """
+    Decontextualizes pairs with one multi-prompt request per group of subclaims.
+
+    Packing ~10 numbered pairs per prompt amortizes the shared system prompt
+    and HTTP round-trip across the group (request count drops N -> N/10), and
+    the groups themselves are sent concurrently. Cached pairs are served
+    without any request.
+
+    Args:
+        pairs: A list of (subclaim, context) tuples.
+        group_size: Number of pairs per request, sized to stay well under the
+            model's context window.
+        max_concurrent: Maximum number of in-flight group requests.
+
+    Returns:
+        The decontextualized subclaims, aligned with the input pairs.
+    """
+    if not pairs:
+        return []
+
+    results = [_DECONTEXT_CACHE.get((subclaim, context)) for subclaim, context in pairs]
+    misses = [i for i, result in enumerate(results) if result is None]
+    if misses:
+        groups = [[pairs[i] for i in misses[start:start + group_size]]
+                  for start in range(0, len(misses), group_size)]
+        group_results = asyncio.run(_gather_decontext_batches(groups, max_concurrent))
+        flat = [result for group in group_results for result in group]
+        for i, result in zip(misses, flat):
+            results[i] = result
+    return results
+
+# Precompiled pronoun dispatch for fallback_decontextualize: one regex match
+# instead of four chained startswith checks, and entity labels accepted per
+# pronoun (None means "any entity that is not a person/group/place")
+_LEADING_PRONOUN_RE = re.compile(r'^(he|she|it|they)\b', re.IGNORECASE)
+_PRONOUN_LABELS = {
+    'he': frozenset({'PERSON'}),
+    'she': frozenset({'PERSON'}),
+    'it': None,
+    'they': frozenset({'ORG', 'GPE', 'NORP'}),
+}
+_NON_THING_LABELS = frozenset({'PERSON', 'NORP', 'GPE'})
+
 def fallback_decontextualize(subclaim: str, context: str) -> str:
     """
     Fallback method for decontextualization using SpaCy's pronoun resolution.
@@ -78,29 +335,21 @@ def fallback_decontextualize(subclaim: str, context: str) -> str:
     Returns:
         The decontextualized subclaim.
     """
+    match = _LEADING_PRONOUN_RE.match(subclaim)
+    if not match:
+        return subclaim
+
+    accepted_labels = _PRONOUN_LABELS[match.group(1).lower()]
     doc = nlp(context)
-    
-    # Basic pronoun resolution
-    if subclaim.lower().startswith("he "):
-        for ent in doc.ents:
-            if ent.label_ == "PERSON":
-                subclaim = subclaim.replace("He", ent.text, 1)
-                break
-    elif subclaim.lower().startswith("she "):
-        for ent in doc.ents:
-            if ent.label_ == "PERSON":
-                subclaim = subclaim.replace("She", ent.text, 1)
-                break
-    elif subclaim.lower().startswith("it "):
-        for ent in doc.ents:
-            if ent.label_ not in ["PERSON", "NORP", "GPE"]:
-                subclaim = subclaim.replace("It", ent.text, 1)
-                break
-    elif subclaim.lower().startswith("they "):
-        # Example handling for 'they'
-        for ent in doc.ents:
-            if ent.label_ in ["ORG", "GPE", "NORP"]:
-                subclaim = subclaim.replace("They", ent.text, 1)
-                break
-    
+
+    # Single pass over the entities, replacing the leading pronoun with the
+    # first entity whose label matches the pronoun type
+    for ent in doc.ents:
+        if accepted_labels is None:
+            if ent.label_ in _NON_THING_LABELS:
+                continue
+        elif ent.label_ not in accepted_labels:
+            continue
+        return _LEADING_PRONOUN_RE.sub(ent.text, subclaim, count=1)
+
     return subclaim
\ No newline at end of file
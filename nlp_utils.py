@@ -0,0 +1,25 @@
+# nlp_utils.py
+
+import functools
+
+import spacy
+
+@functools.lru_cache(maxsize=None)
+def get_nlp(exclude: tuple = ("lemmatizer",)):
+    """
+    Loads the shared spaCy model, caching one instance per exclude set.
+
+    Modules that need the same components share a single in-memory model
+    instead of each paying the load time and the ~40MB duplicate copy.
+
+    The default only drops the lemmatizer. In particular the attribute_ruler
+    must not be excluded casually: in en_core_web_sm it assigns the coarse
+    Token.pos values, so callers that exclude it must not read POS tags.
+
+    Args:
+        exclude: Pipeline components to leave out of the loaded model.
+
+    Returns:
+        The shared spacy.Language instance for this exclude set.
+    """
+    return spacy.load("en_core_web_sm", exclude=list(exclude))
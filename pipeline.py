@@ -1,12 +1,14 @@
+import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the project root directory to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
-from decomposition.decomposition_module import decompose_sentence
-from decontextualization.decontext_module import decontextualize_with_llama3 as decontextualize
+from decomposition.decomposition_module import decompose_sentence, decompose_sentences, decompose_sentences_parallel, long_coref_resolution
+from decontextualization.decontext_module import decontextualize_batch
 from core.core_module import CORE
 from verification.verifier import dndscore_verify
 from typing import List, Tuple, Dict, Union
@@ -19,6 +21,10 @@ try:
 except LookupError:
     nltk.download('punkt')
 
+# Load the Punkt tokenizer once; sent_tokenize re-resolves the pickled model
+# on every call
+_sent_tokenizer = nltk.data.load('tokenizers/punkt/english.pickle')
+
 # Placeholder for WebSearchAgent implementation
 # from web_search_agent import WebSearchAgent  # You'll need to create this module
 
@@ -41,6 +47,10 @@ class FactCheckingPipeline:
         with open(bleached_claims_file, 'r', encoding='utf-8') as f:
             self.bleached_claims = [line.strip() for line in f if line.strip()]
 
+        # The bleached list is static, so tokenize it into CORE's premise
+        # cache once at startup instead of inside the first run_pipeline call
+        self.core.warm_bleached(self.bleached_claims)
+
         # Initialize Decontextualizer to use Llama 3 8B
         # self.decontextualizer = Decontextualizer(model_name="meta-llama/Llama-3-8b-chat-hf")
         # self.decontextualizer = Decontextualizer()
@@ -62,25 +72,37 @@ class FactCheckingPipeline:
                 - A list of dictionaries, each representing a subclaim with its verification status.
         """
 
+        # 0. Coreference Resolution, once over the whole document. Per-sentence
+        # coref is skipped downstream (a lone sentence has no cross-sentence
+        # antecedents), so the HF service is hit at most once per pipeline run.
+        try:
+            text = long_coref_resolution(text)
+        except Exception as e:
+            print(f"Coreference resolution failed, using raw text: {e}")
+
         # 1. Sentence Splitting
         sentences = self.split_into_sentences(text)
         print(f"Split into {len(sentences)} sentences.")
 
-        # 2. Decomposition
+        # 2. Decomposition: one batched nlp.pipe pass, or worker processes
+        # when the document is large enough to amortize their startup cost
+        if len(sentences) >= 64:
+            decomposed = decompose_sentences_parallel(sentences)
+        else:
+            decomposed = decompose_sentences(sentences)
         all_subclaims = []
-        for sentence in sentences:
-            subclaims = decompose_sentence(sentence)
+        for sentence, subclaims in zip(sentences, decomposed):
             for fact in subclaims:
                 # Reconstruct subclaim text from fact components
                 subclaim_text = self.construct_subclaim_text(fact)
                 all_subclaims.append((sentence, subclaim_text))
         print(f"Extracted {len(all_subclaims)} subclaims from decomposition.")
 
-        # 3. Decontextualization
-        decontextualized_subclaims = []
-        for sentence, subclaim in all_subclaims:
-            decontext_claim = decontextualize(subclaim, sentence, openai_key=self.api_key)
-            decontextualized_subclaims.append(decontext_claim)
+        # 3. Decontextualization (subclaims packed into multi-prompt Groq
+        # requests, with the groups issued concurrently)
+        decontextualized_subclaims = decontextualize_batch(
+            [(subclaim, sentence) for sentence, subclaim in all_subclaims]
+        )
         print(f"Decontextualized {len(decontextualized_subclaims)} subclaims.")
 
         # 4. Deduplication (CORE)
@@ -88,15 +110,19 @@ class FactCheckingPipeline:
         filtered_subclaims = [decontextualized_subclaims[i] for i in selected_indices]
         print(f"Selected {len(filtered_subclaims)} unique and informative subclaims after CORE filtering.")
 
-        # 5. Verification
+        # 5. Verification. The evidence searches are pure I/O, so fan them out
+        # across a thread pool and keep the results aligned with the subclaims.
+        def _search_one(subclaim: str) -> List[Dict[str, str]]:
+            return json.loads(search(query=subclaim, num_results=5))
+
+        with ThreadPoolExecutor(max_workers=min(8, max(1, len(filtered_subclaims)))) as executor:
+            all_search_results = list(executor.map(_search_one, filtered_subclaims))
+
         verified_facts = []
-        for subclaim in filtered_subclaims:
-            # Interact with WebSearchAgent to retrieve evidence
-            search_results = json.loads(search(query=subclaim, num_results=5))
-            
+        for subclaim, search_results in zip(filtered_subclaims, all_search_results):
             # Verify the subclaim using the verification function
             is_supported = dndscore_verify(subclaim, subclaim, search_results)  # Pass the subclaim as both subclaim and decontext_claim
-            
+
             verified_facts.append({
                 "subclaim": subclaim,
                 "is_supported": is_supported,
@@ -143,7 +169,7 @@ class FactCheckingPipeline:
         Returns:
             A list of sentences.
         """
-        return sent_tokenize(text)
+        return _sent_tokenizer.tokenize(text)
 
     def formulate_search_query(self, subclaim: str, context: str) -> str:
         """
@@ -1,16 +1,97 @@
 import time
 import os
+import threading
+import numpy as np
 import pandas as pd
+
+# Prefer polars for CSV analytics: its columnar, multi-threaded scan decodes
+# only the requested column. The pandas streaming path remains the fallback.
+try:
+    import polars as pl
+except ImportError:
+    pl = None
 from smolagents import CodeAgent, LiteLLMModel, Tool, tool
 from smolagents.default_tools import PythonInterpreterTool
 from dotenv import load_dotenv
 
+from caching import CachedModel, tool_cache
+
 load_dotenv()
 
 # Rate limiting parameters
 RATE_LIMIT_REQUESTS = 25  # Allow 25 requests...
 RATE_LIMIT_PERIOD = 60  # ...per 60 seconds
 
+class TokenBucket:
+    """
+    Client-side token bucket that paces requests below a provider rate limit.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; each
+    acquire() consumes one, sleeping just long enough when the bucket is
+    empty. Pacing proactively avoids 429 responses and their retry storms.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Blocks until a token is available, then consumes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.tokens + (now - self.last) * self.rate, self.capacity)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+# One bucket per model id, so every agent sharing a model shares its budget
+_buckets = {}
+
+def get_bucket(model_id: str,
+               rate: float = RATE_LIMIT_REQUESTS / RATE_LIMIT_PERIOD,
+               capacity: int = RATE_LIMIT_REQUESTS) -> TokenBucket:
+    """
+    Returns the shared token bucket for a model id, creating it on first use.
+
+    Args:
+        model_id (str): The provider model identifier.
+        rate (float): Token refill rate per second.
+        capacity (int): Maximum burst size.
+
+    Returns:
+        TokenBucket: The shared bucket for this model.
+    """
+    bucket = _buckets.get(model_id)
+    if bucket is None:
+        bucket = _buckets.setdefault(model_id, TokenBucket(rate, capacity))
+    return bucket
+
+class RateLimitedModel:
+    """
+    Wraps a model so every call first takes a token from a shared bucket.
+
+    Everything else (attributes, configuration) is delegated to the wrapped
+    model, so agents can use the wrapper as a drop-in replacement.
+    """
+
+    def __init__(self, model, bucket: TokenBucket):
+        self.model = model
+        self.bucket = bucket
+
+    def __call__(self, *args, **kwargs):
+        self.bucket.acquire()
+        return self.model(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
 # Define the DataAnalysisTool
 class DataAnalysisTool(Tool):
     name = "data_analyzer"
@@ -27,15 +108,84 @@ class DataAnalysisTool(Tool):
     }
     output_type = "string"
 
+    # Repeat (filepath, column) calls are served from the cache; the file's
+    # mtime is part of the key, so rewriting the CSV invalidates the entry,
+    # and error strings are never cached so transient failures retry
+    @tool_cache(ttl=600, key_fn=lambda self, filepath, column:
+                os.path.getmtime(filepath) if os.path.exists(filepath) else None,
+                should_cache=lambda result: result.startswith("Data Analysis"))
     def forward(self, filepath: str, column: str) -> str:
         try:
-            df = pd.read_csv(filepath)
-            if column not in df.columns:
+            # Validate the column from the header alone, without loading rows
+            header = pd.read_csv(filepath, nrows=0)
+            if column not in header.columns:
                 return f"Error: Column '{column}' not found in the DataFrame."
 
-            mean = df[column].mean()
-            median = df[column].median()
-            std_dev = df[column].std()
+            if pl is not None:
+                try:
+                    stats = (
+                        pl.scan_csv(filepath)
+                        .select([
+                            pl.col(column).mean().alias("mean"),
+                            pl.col(column).median().alias("median"),
+                            pl.col(column).std().alias("std"),
+                        ])
+                        .collect(streaming=True)
+                    )
+                    mean, median, std_dev = stats.row(0)
+                    return (
+                        f"Data Analysis for column '{column}' in file '{filepath}':\n"
+                        f"  Mean: {mean:.2f}\n"
+                        f"  Median: {median:.2f}\n"
+                        f"  Standard Deviation: {std_dev:.2f}"
+                    )
+                except Exception:
+                    # Fall back to the pandas streaming path below
+                    pass
+
+            # Stream only the requested column in chunks: mean/std come from
+            # Welford-style online aggregation and the median from a bounded
+            # reservoir sample, so peak memory is O(chunk) instead of O(file)
+            n = 0
+            mean = 0.0
+            m2 = 0.0
+            reservoir_max = 100_000
+            reservoir = np.empty(0, dtype="float64")
+            seen = 0
+            rng = np.random.default_rng()
+            for chunk in pd.read_csv(filepath, usecols=[column], chunksize=256_000):
+                values = chunk[column].to_numpy(dtype="float64")
+                values = values[~np.isnan(values)]
+                k = values.size
+                if k == 0:
+                    continue
+
+                # Combine the chunk's moments into the running aggregate
+                chunk_mean = values.mean()
+                delta = chunk_mean - mean
+                total = n + k
+                mean += delta * k / total
+                m2 += ((values - chunk_mean) ** 2).sum() + delta * delta * n * k / total
+                n = total
+
+                # Reservoir sample for the median (exact while the data fits)
+                if reservoir.size < reservoir_max:
+                    take = min(reservoir_max - reservoir.size, k)
+                    reservoir = np.concatenate([reservoir, values[:take]])
+                    seen += take
+                    values = values[take:]
+                    k = values.size
+                if k:
+                    positions = rng.integers(0, seen + np.arange(1, k + 1))
+                    hits = positions < reservoir_max
+                    reservoir[positions[hits]] = values[hits]
+                    seen += k
+
+            if n == 0:
+                return f"Error: Column '{column}' contains no numeric data."
+
+            median = float(np.median(reservoir))
+            std_dev = (m2 / (n - 1)) ** 0.5 if n > 1 else 0.0
 
             result = (
                 f"Data Analysis for column '{column}' in file '{filepath}':\n"
@@ -49,8 +199,12 @@ class DataAnalysisTool(Tool):
         except Exception as e:
             return f"Error during data analysis: {e}"
 
-# Initialize the Groq model using LiteLLM
-your_groq_model = LiteLLMModel(model_id="groq/llama-3.3-70b-versatile")
+# Initialize the Groq model using LiteLLM, paced by the shared token bucket.
+# The cache sits outside the limiter, so hits never spend a token.
+your_groq_model = CachedModel(RateLimitedModel(
+    LiteLLMModel(model_id="groq/llama-3.3-70b-versatile"),
+    get_bucket("groq/llama-3.3-70b-versatile"),
+))
 
 # Create tool instances
 data_analysis_tool = DataAnalysisTool()
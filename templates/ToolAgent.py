@@ -3,6 +3,8 @@
 from smolagents import ToolCallingAgent, LiteLLMModel, Tool
 from dotenv import load_dotenv
 
+from caching import CachedModel
+
 load_dotenv()
 
 
@@ -19,8 +21,8 @@ class GreetingTool(Tool):
         return f"Hello, {name}! It's nice to see you."
 
 
-# Initialize the Groq model
-your_groq_model = LiteLLMModel(model_id="groq/llama-3.3-70b-versatile")
+# Initialize the Groq model, with deterministic calls served from the cache
+your_groq_model = CachedModel(LiteLLMModel(model_id="groq/llama-3.3-70b-versatile"))
 
 # Create tool instances
 greeting_tool = GreetingTool()
@@ -31,6 +33,28 @@ json_grammar = {
     "value": r'\{\s*"action":\s*"[\w_]+",\s*"action_input":\s*\{.*\}\s*\}',
 }
 
+# The same grammar compiled once for client-side checks. google-re2 scans as
+# a linear-time DFA with no catastrophic backtracking on malformed model
+# output; the stdlib engine is the fallback when re2 is not installed.
+try:
+    import re2 as _re_engine
+except ImportError:
+    import re as _re_engine
+
+_TOOL_CALL_RE = _re_engine.compile(json_grammar["value"])
+
+def is_valid_tool_call(text: str) -> bool:
+    """
+    Checks whether text contains a tool call matching the JSON grammar.
+
+    Args:
+        text: The candidate model output.
+
+    Returns:
+        True if the grammar matches anywhere in the text.
+    """
+    return _TOOL_CALL_RE.search(text) is not None
+
 # Initialize the ToolCallingAgent
 tool_calling_agent = ToolCallingAgent(
     model=your_groq_model,
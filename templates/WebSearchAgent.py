@@ -1,14 +1,114 @@
 # agents/WebSearchAgent.py
 
+import asyncio
 import os
+import re
+import httpx
 import requests
 import json
 from typing import List, Dict
 from smolagents import Tool, tool
 import time
 
-# Define the DuckDuckGoSearchTool
+try:
+    from .caching import tool_cache
+except ImportError:  # Run directly as a script rather than as templates.*
+    from caching import tool_cache
+
+# Shared limits for the async batch helpers: bounded connection pool with
+# keep-alive so fan-outs reuse sockets instead of re-handshaking per URL
+_ASYNC_LIMITS = httpx.Limits(max_connections=100, keepalive_expiry=10)
+
+# Collapse runs of blank lines left over from HTML conversion
+_MULTI_NL = re.compile(r"\n{3,}")
+
+# Prefer selectolax (C bindings to lexbor) for HTML-to-text; fall back to the
+# pure-Python markdownify walk when it is not installed
+try:
+    from selectolax.parser import HTMLParser as _HTMLParser
+except ImportError:
+    _HTMLParser = None
+
+def _html_to_markdown(html: str) -> str:
+    """
+    Converts an HTML document to Markdown-style text.
+
+    Args:
+        html (str): The raw HTML.
+
+    Returns:
+        str: The extracted text, with anchors rewritten as [text](url).
+    """
+    if _HTMLParser is not None:
+        tree = _HTMLParser(html)
+        for node in tree.css('script,style'):
+            node.decompose()
+        for anchor in tree.css('a'):
+            href = anchor.attributes.get('href')
+            text = anchor.text(strip=True)
+            if href and text:
+                anchor.replace_with(f"[{text}]({href})")
+        body = tree.body if tree.body is not None else tree.root
+        return _MULTI_NL.sub("\n\n", body.text(separator="\n")).strip()
+
+    from markdownify import markdownify
+    return _MULTI_NL.sub("\n\n", markdownify(html).strip())
+
+def _extract_results(data: Dict, num_results: int) -> List[Dict[str, str]]:
+    """
+    Extracts search results from a DuckDuckGo Instant Answer API response.
+
+    Args:
+        data (Dict): The parsed API response.
+        num_results (int): The maximum number of results to return.
+
+    Returns:
+        List[Dict[str, str]]: Results with 'title', 'snippet', and 'link'.
+    """
+    results = []
+    # DuckDuckGo's Instant Answer API provides 'RelatedTopics' as search results
+    for topic in data.get('RelatedTopics', []):
+        if 'Text' in topic and 'FirstURL' in topic:
+            results.append({
+                'title': topic.get('Name', 'No Title'),
+                'snippet': topic.get('Text', ''),
+                'link': topic.get('FirstURL', '')
+            })
+            if len(results) >= num_results:
+                break
+        elif 'Topics' in topic:
+            for subtopic in topic.get('Topics', []):
+                if 'Text' in subtopic and 'FirstURL' in subtopic:
+                    results.append({
+                        'title': subtopic.get('Name', 'No Title'),
+                        'snippet': subtopic.get('Text', ''),
+                        'link': subtopic.get('FirstURL', '')
+                    })
+                    if len(results) >= num_results:
+                        break
+    return results
+
+def _search_result_ok(result: str) -> bool:
+    """
+    Returns True when a search payload is cacheable, i.e. not an error marker.
+
+    Args:
+        result (str): The JSON string returned by duckduckgo_search.
+
+    Returns:
+        bool: False for the error payloads the tool emits on failure.
+    """
+    try:
+        parsed = json.loads(result)
+    except ValueError:
+        return False
+    return not any(entry.get('title') in ('Error', 'Unexpected Error') and not entry.get('link')
+                   for entry in parsed)
+
+# Define the DuckDuckGoSearchTool; repeat queries skip the network for the
+# cache TTL, but failed lookups are never cached
 @tool
+@tool_cache(ttl=600, should_cache=_search_result_ok)
 def duckduckgo_search(query: str, num_results: int = 5) -> str:
     """
     Performs a web search using DuckDuckGo and returns the search results in JSON format.
@@ -33,28 +133,7 @@ def duckduckgo_search(query: str, num_results: int = 5) -> str:
         response.raise_for_status()
         data = response.json()
 
-        results = []
-        # DuckDuckGo's Instant Answer API provides 'RelatedTopics' as search results
-        for topic in data.get('RelatedTopics', []):
-            if 'Text' in topic and 'FirstURL' in topic:
-                results.append({
-                    'title': topic.get('Name', 'No Title'),
-                    'snippet': topic.get('Text', ''),
-                    'link': topic.get('FirstURL', '')
-                })
-                if len(results) >= num_results:
-                    break
-            elif 'Topics' in topic:
-                for subtopic in topic.get('Topics', []):
-                    if 'Text' in subtopic and 'FirstURL' in subtopic:
-                        results.append({
-                            'title': subtopic.get('Name', 'No Title'),
-                            'snippet': subtopic.get('Text', ''),
-                            'link': subtopic.get('FirstURL', '')
-                        })
-                        if len(results) >= num_results:
-                            break
-        return json.dumps(results)
+        return json.dumps(_extract_results(data, num_results))
     except requests.exceptions.RequestException as e:
         return json.dumps([{'title': 'Error', 'snippet': str(e), 'link': ''}])
     except Exception as e:
@@ -72,8 +151,6 @@ def visit_webpage(url: str) -> str:
     Returns:
         str: The content of the webpage converted to Markdown, or an error message if the request fails.
     """
-    import re
-    from markdownify import markdownify
     from requests.exceptions import RequestException
 
     try:
@@ -82,18 +159,105 @@ def visit_webpage(url: str) -> str:
         response.raise_for_status()  # Raise an exception for bad status codes
 
         # Convert the HTML content to Markdown
-        markdown_content = markdownify(response.text).strip()
-
-        # Remove multiple line breaks
-        markdown_content = re.sub(r"\n{3,}", "\n\n", markdown_content)
-
-        return markdown_content
+        return _html_to_markdown(response.text)
 
     except RequestException as e:
         return f"Error fetching the webpage: {str(e)}"
     except Exception as e:
         return f"An unexpected error occurred: {str(e)}"
 
+async def _fetch_markdown(client: "httpx.AsyncClient", sem: "asyncio.Semaphore", url: str) -> str:
+    """
+    Fetches one URL and converts it to Markdown, mirroring visit_webpage.
+
+    Args:
+        client (httpx.AsyncClient): The shared async client.
+        sem (asyncio.Semaphore): Bounds the number of in-flight requests.
+        url (str): The URL to fetch.
+
+    Returns:
+        str: The Markdown content, or an error message if the request fails.
+    """
+    async with sem:
+        try:
+            response = await client.get(url, timeout=10)
+            response.raise_for_status()
+            return _html_to_markdown(response.text)
+        except httpx.HTTPError as e:
+            return f"Error fetching the webpage: {str(e)}"
+        except Exception as e:
+            return f"An unexpected error occurred: {str(e)}"
+
+async def _gather_webpages(urls: List[str], max_concurrent: int) -> List[str]:
+    sem = asyncio.Semaphore(max_concurrent)
+    async with httpx.AsyncClient(limits=_ASYNC_LIMITS, follow_redirects=True) as client:
+        return list(await asyncio.gather(
+            *[_fetch_markdown(client, sem, url) for url in urls]
+        ))
+
+def visit_webpage_many(urls: List[str], max_concurrent: int = 10) -> List[str]:
+    """
+    Visits many webpages concurrently and returns their Markdown contents.
+
+    The fetches are pure network I/O, so fanning them out through one async
+    client makes the batch cost roughly max(fetch_time) instead of the sum.
+
+    Args:
+        urls (List[str]): The URLs to visit.
+        max_concurrent (int): Maximum number of in-flight requests.
+
+    Returns:
+        List[str]: Markdown content (or an error message) per URL, in order.
+    """
+    if not urls:
+        return []
+    return asyncio.run(_gather_webpages(urls, max_concurrent))
+
+async def _search_one_async(client: "httpx.AsyncClient", sem: "asyncio.Semaphore",
+                            query: str, num_results: int) -> str:
+    params = {
+        'q': query,
+        'format': 'json',
+        'no_html': 1,
+        'skip_disambig': 1
+    }
+    async with sem:
+        try:
+            response = await client.get("https://api.duckduckgo.com/", params=params, timeout=10)
+            response.raise_for_status()
+            return json.dumps(_extract_results(response.json(), num_results))
+        except httpx.HTTPError as e:
+            return json.dumps([{'title': 'Error', 'snippet': str(e), 'link': ''}])
+        except Exception as e:
+            return json.dumps([{'title': 'Unexpected Error', 'snippet': str(e), 'link': ''}])
+
+async def _gather_searches(queries: List[str], num_results: int, max_concurrent: int) -> List[str]:
+    sem = asyncio.Semaphore(max_concurrent)
+    async with httpx.AsyncClient(limits=_ASYNC_LIMITS) as client:
+        return list(await asyncio.gather(
+            *[_search_one_async(client, sem, query, num_results) for query in queries]
+        ))
+
+def duckduckgo_search_many(queries: List[str], num_results: int = 5,
+                           max_concurrent: int = 10) -> List[str]:
+    """
+    Runs many DuckDuckGo searches concurrently.
+
+    Args:
+        queries (List[str]): The search queries.
+        num_results (int): The number of results to return per query.
+        max_concurrent (int): Maximum number of in-flight requests.
+
+    Returns:
+        List[str]: One JSON result string per query, in order.
+    """
+    if not queries:
+        return []
+    return asyncio.run(_gather_searches(queries, num_results, max_concurrent))
+
+# Alias used by the fact-checking pipeline
+search = duckduckgo_search
+
 # Initialize the WebSearchAgent
 def initialize_web_search_agent(model, max_steps: int = 5, additional_imports: List[str] = []):
     """
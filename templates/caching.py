@@ -0,0 +1,153 @@
+# templates/caching.py
+
+import functools
+import hashlib
+import logging
+import threading
+import time
+
+# ujson's C serializer keeps key derivation cheap on large prompt payloads;
+# the stdlib encoder is the fallback
+try:
+    import ujson as _json
+except ImportError:
+    import json as _json
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Minimal thread-safe in-process cache with per-entry expiry.
+
+    Entries older than `ttl` seconds are treated as misses; when the cache is
+    full the oldest entry is dropped. Small enough that no external caching
+    dependency is needed.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = {}  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() > expires_at:
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            if len(self._data) >= self.maxsize:
+                self._data.pop(next(iter(self._data)))  # Drop the oldest entry
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+
+def cache_key(payload) -> str:
+    """
+    Builds a deterministic cache key from an arbitrary JSON-able payload.
+
+    Args:
+        payload: The call description (model id, messages, kwargs, ...).
+
+    Returns:
+        str: A hex digest stable across processes and runs. Serialization
+            uses a C JSON encoder when available, and BLAKE2b with a 16-byte
+            digest keeps hashing fast while staying collision-resistant for
+            cache purposes.
+    """
+    serialized = _json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.blake2b(serialized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CachedModel:
+    """
+    Wraps a model so deterministic calls are served from a response cache.
+
+    Only calls whose temperature is known to be 0 — passed explicitly or set
+    on the wrapped model — are cached; sampled generations, and calls whose
+    temperature is unknown (the provider default applies), pass straight
+    through. The wrapped model is otherwise a drop-in replacement, delegating
+    attribute access.
+    """
+
+    def __init__(self, model, backend: "TTLCache" = None):
+        self.model = model
+        self.backend = backend or TTLCache()
+
+    def __call__(self, *args, **kwargs):
+        # Cache only when the call is provably deterministic: an unknown
+        # temperature means the provider's (sampling) default applies
+        temperature = kwargs.get("temperature", getattr(self.model, "temperature", None))
+        if temperature is None or temperature > 0:
+            return self.model(*args, **kwargs)
+
+        key = cache_key({
+            "model": getattr(self.model, "model_id", repr(self.model)),
+            "args": args,
+            "kwargs": kwargs,
+        })
+        cached = self.backend.get(key)
+        if cached is not None:
+            logger.debug("LLM cache hit for %s", key[:12])
+            return cached
+
+        result = self.model(*args, **kwargs)
+        self.backend.set(key, result)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+def tool_cache(ttl: float = 600, key_fn=None, should_cache=None):
+    """
+    Memoizes a tool's forward function with a per-tool TTL cache.
+
+    The key covers the function name and its call arguments; `key_fn` can add
+    extra invalidation state (e.g. a file's mtime) computed from the same
+    arguments. Tools that report failures as ordinary return values should
+    pass `should_cache` so a transient error is not pinned for the full TTL.
+    The cache is exposed as `wrapper.cache` so callers can inspect or clear
+    it, and wrapping can be skipped entirely for tools that must not be
+    cached.
+
+    Args:
+        ttl: Seconds a cached result stays valid.
+        key_fn: Optional callable over the original arguments whose return
+            value is mixed into the cache key.
+        should_cache: Optional predicate over the result; when it returns
+            False the result is returned but not stored.
+
+    Returns:
+        The decorator.
+    """
+    def decorator(func):
+        cache = TTLCache(maxsize=2048, ttl=ttl)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = cache_key({
+                "tool": func.__qualname__,
+                "args": args,
+                "kwargs": kwargs,
+                "extra": key_fn(*args, **kwargs) if key_fn is not None else None,
+            })
+            cached = cache.get(key)
+            if cached is not None:
+                logger.debug("Tool cache hit for %s", func.__qualname__)
+                return cached
+            result = func(*args, **kwargs)
+            if should_cache is None or should_cache(result):
+                cache.set(key, result)
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
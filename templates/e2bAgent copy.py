@@ -2,10 +2,13 @@ import os
 from smolagents import CodeAgent, LiteLLMModel
 from dotenv import load_dotenv
 
+from caching import CachedModel
+
 load_dotenv()
 
-# Initialize the Groq model using LiteLLM
-your_groq_model = LiteLLMModel(model_id="groq/llama-3.3-70b-versatile")
+# Initialize the Groq model using LiteLLM, with deterministic calls served
+# from the shared response cache
+your_groq_model = CachedModel(LiteLLMModel(model_id="groq/llama-3.3-70b-versatile"))
 
 # Initialize the CodeAgent with E2B enabled
 code_agent = CodeAgent(
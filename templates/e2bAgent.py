@@ -1,13 +1,39 @@
 # e2bAgent.py
 
+import functools
+import os
+import random
 import requests
+import re
 import time
 import json
 from typing import List, Dict, Any
 import spacy
+from spacy.matcher import DependencyMatcher
 import logging
 import yaml
 
+# Paragraph splitter compiled once; also tolerates runs of 3+ newlines
+_PARA_RE = re.compile(r"\n{2,}")
+
+@functools.lru_cache(maxsize=8)
+def _load_cfg(path: str, mtime: float) -> Dict[str, Any]:
+    """
+    Parses a YAML config, memoized on (path, mtime).
+
+    Repeated agent construction reuses the parsed dict; editing the file
+    changes its mtime and naturally invalidates the entry.
+
+    Args:
+        path (str): Path to the YAML file.
+        mtime (float): The file's modification time, part of the cache key.
+
+    Returns:
+        Dict[str, Any]: The parsed configuration.
+    """
+    with open(path, 'r') as file:
+        return yaml.safe_load(file)
+
 # Initialize logging
 logging.basicConfig(
     level=logging.INFO,
@@ -18,24 +44,60 @@ logging.basicConfig(
 
 class E2BAgent:
     def __init__(self, config_path: str):
-        # Load configuration
-        with open(config_path, 'r') as file:
-            config = yaml.safe_load(file)
+        # Load configuration (cached across instantiations until the file changes)
+        config = _load_cfg(config_path, os.path.getmtime(config_path))
         
         self.api_url = config['coref']['api_url']
         self.hf_access_token = config['coref']['hf_access_token']
         self.headers = {"Authorization": f"Bearer {self.hf_access_token}"}
         self.max_retries = config['coref'].get('max_retries', 10)
         self.backoff_factor = config['coref'].get('backoff_factor', 5.0)
+
+        # Persistent session: keep-alive reuses the TCP+TLS connection across
+        # Inference API calls instead of re-handshaking per request
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
         
-        # Initialize SpaCy
+        # Initialize SpaCy. Fact extraction only reads the POS tags and the
+        # dependency parse, so ner and the lemmatizer are left out — but the
+        # attribute_ruler stays, since it assigns the coarse Token.pos the
+        # DependencyMatcher patterns anchor on. The parse runs on GPU when
+        # one is available.
         try:
-            self.nlp = spacy.load("en_core_web_sm")
+            spacy.prefer_gpu()
+            self.nlp = spacy.load("en_core_web_sm",
+                                  exclude=["ner", "lemmatizer"])
             logging.info("SpaCy model loaded successfully.")
         except Exception as e:
             logging.error(f"Failed to load SpaCy model: {e}")
             raise e
 
+        # Dependency patterns for fact extraction, matched in C by spaCy
+        # instead of a per-token Python loop. Subject, object, and
+        # prepositional attachments are separate patterns so each is optional;
+        # extract_facts joins them back up by verb.
+        verb = {"RIGHT_ID": "verb", "RIGHT_ATTRS": {"POS": "VERB"}}
+        self.matcher = DependencyMatcher(self.nlp.vocab)
+        self.matcher.add("FACT_SV", [[
+            verb,
+            {"LEFT_ID": "verb", "REL_OP": ">", "RIGHT_ID": "subject",
+             "RIGHT_ATTRS": {"DEP": "nsubj"}},
+        ]])
+        self.matcher.add("FACT_VO", [[
+            verb,
+            {"LEFT_ID": "verb", "REL_OP": ">", "RIGHT_ID": "object",
+             "RIGHT_ATTRS": {"DEP": "dobj"}},
+        ]])
+        self.matcher.add("FACT_VPREP", [[
+            verb,
+            {"LEFT_ID": "verb", "REL_OP": ">", "RIGHT_ID": "prep",
+             "RIGHT_ATTRS": {"DEP": "prep"}},
+            {"LEFT_ID": "prep", "REL_OP": ">", "RIGHT_ID": "pobj",
+             "RIGHT_ATTRS": {"DEP": "pobj"}},
+        ]])
+        self._sv_id = self.nlp.vocab.strings["FACT_SV"]
+        self._vo_id = self.nlp.vocab.strings["FACT_VO"]
+
     def query_long_coref(self, paragraphs: List[str]) -> Dict[str, Any]:
         """
         Query the long-coref model via Hugging Face's Inference API.
@@ -54,9 +116,8 @@ class E2BAgent:
         retries = 0
         while retries < self.max_retries:
             try:
-                response = requests.post(
+                response = self.session.post(
                     self.api_url,
-                    headers=self.headers,
                     json=payload,
                     timeout=60
                 )
@@ -64,11 +125,21 @@ class E2BAgent:
                 logging.error(f"Request failed: {e}")
                 raise e
 
-            if response.status_code == 503:
-                # Model is loading
+            if response.status_code in (429, 503):
+                # Model loading or rate limited. Honor Retry-After when the
+                # server provides it; otherwise back off exponentially with
+                # full jitter so concurrent clients do not retry in lockstep.
+                retry_after = response.headers.get("Retry-After")
+                if retry_after is not None:
+                    try:
+                        delay = float(retry_after)
+                    except ValueError:
+                        retry_after = None
+                if retry_after is None:
+                    delay = min(60, self.backoff_factor * (2 ** retries)) * random.random()
                 error_message = response.json().get("error", "Service unavailable.")
-                logging.info(f"Model loading: {error_message}. Retrying in {self.backoff_factor} seconds.")
-                time.sleep(self.backoff_factor)
+                logging.info(f"Transient {response.status_code}: {error_message}. Retrying in {delay:.1f} seconds.")
+                time.sleep(delay)
                 retries += 1
                 continue
             elif response.status_code == 200:
@@ -117,36 +188,35 @@ class E2BAgent:
         Returns:
             List[Dict[str, Any]]: A list of extracted facts.
         """
+        # One C-backed matcher pass over the whole doc, then regroup the
+        # matches by their anchoring verb
+        subjects = {}
+        objects = {}
+        preps = {}
+        for match_id, token_ids in self.matcher(doc):
+            if match_id == self._sv_id:
+                verb_i, subj_i = token_ids
+                subjects.setdefault(verb_i, subj_i)
+            elif match_id == self._vo_id:
+                verb_i, obj_i = token_ids
+                objects.setdefault(verb_i, obj_i)
+            else:
+                verb_i, prep_i, pobj_i = token_ids
+                preps.setdefault(verb_i, []).append((prep_i, pobj_i))
+
         facts = []
-        for sent in doc.sents:
-            # Example extraction logic; replace with your actual method
-            subject = ""
-            verb = ""
-            direct_object = ""
-            prepositional_objects = []
-
-            for token in sent:
-                if token.dep_ == "nsubj":
-                    subject = token.text
-                if token.pos_ == "VERB":
-                    verb = token.text
-                if token.dep_ == "dobj":
-                    direct_object = token.text
-                if token.dep_ == "prep":
-                    pobj = [child.text for child in token.children if child.dep_ == "pobj"]
-                    if pobj:
-                        prepositional_objects.append(f"{token.text.capitalize()} {' '.join(pobj)}")
-
-            if subject and verb:
-                fact = {
-                    "subject": subject,
-                    "verb": verb,
-                    "direct_object": direct_object,
-                    "prepositional_objects": prepositional_objects
-                }
-                facts.append(fact)
-                logging.debug(f"Extracted fact: {fact}")
-        
+        for verb_i in sorted(subjects):
+            obj_i = objects.get(verb_i)
+            fact = {
+                "subject": doc[subjects[verb_i]].text,
+                "verb": doc[verb_i].text,
+                "direct_object": doc[obj_i].text if obj_i is not None else "",
+                "prepositional_objects": [f"{doc[prep_i].text.capitalize()} {doc[pobj_i].text}"
+                                          for prep_i, pobj_i in preps.get(verb_i, [])]
+            }
+            facts.append(fact)
+            logging.debug(f"Extracted fact: {fact}")
+
         logging.info(f"Total facts extracted: {len(facts)}")
         return facts
 
@@ -172,9 +242,12 @@ class E2BAgent:
             resolved_text = self.resolve_coreferences(coref_output, paragraphs)
             logging.info(f"Resolved Text: {resolved_text}")
             
-            # Continue with existing decomposition logic using resolved_text
-            doc = self.nlp(resolved_text)
-            facts = self.extract_facts(doc)
+            # Continue with existing decomposition logic, parsing the
+            # resolved paragraphs in one batched pipe pass
+            facts = []
+            resolved_paragraphs = [p for p in _PARA_RE.split(resolved_text) if p]
+            for doc in self.nlp.pipe(resolved_paragraphs, batch_size=32):
+                facts.extend(self.extract_facts(doc))
             return facts
         except requests.HTTPError as e:
             logging.error(f"Coreference resolution failed with HTTPError: {e}. Proceeding without coref.")
@@ -186,6 +259,39 @@ class E2BAgent:
         facts = self.extract_facts(doc)
         return facts
 
+    def decompose_sentences(self, sentences: List[str], batch_size: int = 16) -> List[List[Dict[str, Any]]]:
+        """
+        Decompose many sentences, batching the coref round-trips.
+
+        Up to batch_size sentences share one Inference API payload (joined on
+        the paragraph delimiter and demultiplexed from the response), and the
+        resolved texts are parsed in one nlp.pipe pass, so the per-call
+        network and pipeline overheads are amortized across the batch.
+
+        Args:
+            sentences (List[str]): The sentences to decompose.
+            batch_size (int): Sentences packed into each coref payload.
+
+        Returns:
+            List[List[Dict[str, Any]]]: One list of facts per sentence, in order.
+        """
+        results = []
+        for start in range(0, len(sentences), batch_size):
+            batch = sentences[start:start + batch_size]
+            try:
+                coref_output = self.query_long_coref(batch)
+                resolved_batch = self.resolve_coreferences(coref_output, batch).split("\n\n")
+                if len(resolved_batch) != len(batch):
+                    logging.error("Coref response did not demultiplex cleanly. Proceeding without coref.")
+                    resolved_batch = batch
+            except Exception as e:
+                logging.error(f"Batched coreference resolution failed: {e}. Proceeding without coref.")
+                resolved_batch = batch
+
+            for doc in self.nlp.pipe(resolved_batch, batch_size=64):
+                results.append(self.extract_facts(doc))
+        return results
+
     def split_into_paragraphs(self, text: str) -> List[str]:
         """
         Split the text into paragraphs. Customize if needed.
@@ -196,8 +302,8 @@ class E2BAgent:
         Returns:
             List[str]: A list of paragraph strings.
         """
-        # Simple split by double newline; adjust as necessary
-        paragraphs = text.strip().split("\n\n")
+        # Precompiled split on blank lines; adjust as necessary
+        paragraphs = [p for p in _PARA_RE.split(text.strip()) if p]
         logging.debug(f"Text split into paragraphs: {paragraphs}")
         return paragraphs
 
@@ -0,0 +1,24 @@
+# tests/test_decomposition.py
+
+import os
+import sys
+
+import pytest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("spacy")
+try:
+    from decomposition.decomposition_module import decompose_sentence
+except Exception as exc:  # pragma: no cover - model or optional deps missing
+    pytest.skip(f"decomposition module unavailable: {exc}", allow_module_level=True)
+
+
+def test_decompose_sentence_yields_fact():
+    # A plain SVO sentence must produce at least one fact; this guards the
+    # spaCy pipeline configuration (an exclude that drops POS tagging makes
+    # every sentence silently decompose to nothing)
+    facts = decompose_sentence("John bought milk.")
+    assert facts
+    assert any("John" in fact for fact in facts)
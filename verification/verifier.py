@@ -1,9 +1,121 @@
 # verification/verifier.py
 
 import logging
-from typing import List, Dict, Any
+import os
+import platform
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple
+
+import torch
+from transformers import pipeline
+
+# Avoid tokenizer fork warnings (and oversubscription) when callers combine
+# verification with their own worker pools
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+# Shared NLI pipeline for claim-vs-evidence entailment, built lazily so
+# importing this module stays cheap; FP16 on GPU halves the memory bandwidth
+# per forward pass
+_PIPE = None
+
+def _get_pipe():
+    """Returns the shared NLI pipeline, loading the model on first use."""
+    global _PIPE
+    if _PIPE is None:
+        _PIPE = pipeline(
+            "text-classification",
+            model="roberta-large-mnli",
+            device=0 if torch.cuda.is_available() else -1,
+            torch_dtype=torch.float16 if torch.cuda.is_available() else None,
+        )
+        if not torch.cuda.is_available():
+            # Quantize the linear layers to dynamic INT8 for CPU inference
+            # (roughly 2x lower latency and 4x smaller weights, negligible
+            # accuracy drop on MNLI)
+            try:
+                torch.backends.quantized.engine = 'qnnpack' if platform.machine().lower() in ('arm64', 'aarch64') else 'fbgemm'
+                _PIPE.model = torch.quantization.quantize_dynamic(
+                    _PIPE.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+            except Exception as e:
+                logging.error(f"Dynamic quantization unavailable, using FP32 model: {e}")
+    return _PIPE
+
+def warmup() -> None:
+    """Eagerly loads the NLI model, for callers that prefer paying the load
+    cost at startup rather than on the first verification."""
+    _get_pipe()
+
+# Process-lifetime cache of NLI predictions keyed on (snippet, claim), with
+# hit/miss counters for observability; repeated pairs across subclaims and
+# reruns skip the forward pass entirely
+_NLI_CACHE: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_NLI_CACHE_MAX = 8192
+nli_cache_stats = {"hits": 0, "misses": 0}
+
+# Snippets scored per forward when probing for an early entailment hit
+_EARLY_EXIT_GROUP = 4
+
+def _nli_cache_put(key: Tuple[str, str], pred: Dict[str, Any]) -> None:
+    if len(_NLI_CACHE) >= _NLI_CACHE_MAX:
+        _NLI_CACHE.pop(next(iter(_NLI_CACHE)))  # Drop the oldest entry
+    _NLI_CACHE[key] = pred
+
+def dndscore_verify(subclaim: str, decontext_claim: str, knowledge_source: List[Dict[str, str]]) -> bool:
+    """
+    Verifies a decontextualized claim against retrieved evidence snippets.
+
+    All (snippet, claim) pairs are scored in one padded batch, so the model
+    runs a single fused forward instead of one pass (plus tokenization) per
+    snippet.
+
+    Args:
+        subclaim (str): The original subclaim the evidence was retrieved for.
+        decontext_claim (str): The decontextualized claim to check.
+        knowledge_source (List[Dict[str, str]]): Search results, each with a
+            'snippet' field.
+
+    Returns:
+        bool: True if any snippet entails the claim with score > 0.7.
+    """
+    snippets = [result.get("snippet", "") for result in knowledge_source]
+    if not snippets:
+        return False
+
+    # Serve cached pairs first; they may settle the claim without a forward
+    preds = [_NLI_CACHE.get((snippet, decontext_claim)) for snippet in snippets]
+    misses = [i for i, pred in enumerate(preds) if pred is None]
+    nli_cache_stats["hits"] += len(preds) - len(misses)
+    if any(pred["label"] == "ENTAILMENT" and pred["score"] > 0.7
+           for pred in preds if pred is not None):
+        return True
+
+    # Score the remaining snippets in small groups, stopping at the first
+    # entailment: one supporting snippet usually appears early, so later
+    # groups are often never run, while each forward still amortizes batch
+    # overhead over a few pairs
+    for start in range(0, len(misses), _EARLY_EXIT_GROUP):
+        group = misses[start:start + _EARLY_EXIT_GROUP]
+        nli_cache_stats["misses"] += len(group)
+        pairs = [{"text": snippets[i], "text_pair": decontext_claim} for i in group]
+        try:
+            new_preds = _get_pipe()(pairs, batch_size=16, truncation=True, max_length=512)
+        except Exception as e:
+            logging.error(f"Error running entailment over evidence for '{subclaim}': {e}")
+            return False
+        for i, pred in zip(group, new_preds):
+            _nli_cache_put((snippets[i], decontext_claim), pred)
+        if any(pred["label"] == "ENTAILMENT" and pred["score"] > 0.7 for pred in new_preds):
+            return True
+
+    return False
 
 class Verifier:
+    # Word-boundary keyword scan for the placeholder DND heuristic, compiled
+    # once at class definition
+    _KW_RE = re.compile(r"\b(?:is|are|was|were|has|have|had)\b", re.IGNORECASE)
+
     def __init__(self):
         # Initialize any required resources, e.g., access to verification databases or APIs
         pass
@@ -18,25 +130,40 @@ class Verifier:
         Returns:
             List[Dict[str, Any]]: List containing verification results with DND Scores.
         """
-        verification_results = []
-        for fact in decontextualized_facts:
-            try:
-                score = self.calculate_dnd_score(fact)
-                verification_results.append({
-                    "fact": fact,
-                    "dnd_score": score,
-                    "verified": score >= 0.5  # Threshold for verification
-                })
-                logging.debug(f"Fact: {fact} | DND Score: {score}")
-            except Exception as e:
-                logging.error(f"Error verifying fact '{fact}': {e}")
-                verification_results.append({
-                    "fact": fact,
-                    "dnd_score": 0.0,
-                    "verified": False
-                })
+        if not decontextualized_facts:
+            return []
+        # Facts are independent, so verify them across a thread pool; results
+        # come back in input order
+        with ThreadPoolExecutor(max_workers=min(32, len(decontextualized_facts))) as executor:
+            verification_results = list(executor.map(self._verify_one, decontextualized_facts))
         logging.info(f"Total facts verified: {len(verification_results)}")
         return verification_results
+
+    def _verify_one(self, fact: str) -> Dict[str, Any]:
+        """
+        Verify a single decontextualized fact.
+
+        Args:
+            fact (str): The decontextualized fact.
+
+        Returns:
+            Dict[str, Any]: The verification result with its DND Score.
+        """
+        try:
+            score = self.calculate_dnd_score(fact)
+            logging.debug(f"Fact: {fact} | DND Score: {score}")
+            return {
+                "fact": fact,
+                "dnd_score": score,
+                "verified": score >= 0.5  # Threshold for verification
+            }
+        except Exception as e:
+            logging.error(f"Error verifying fact '{fact}': {e}")
+            return {
+                "fact": fact,
+                "dnd_score": 0.0,
+                "verified": False
+            }
     
     def calculate_dnd_score(self, fact: str) -> float:
         """
@@ -51,11 +178,6 @@ class Verifier:
         """
         # Placeholder: Simple heuristic based on keyword matching
         # Replace with actual DND Score computation
-        keywords = ["is", "are", "was", "were", "has", "have", "had"]
-        score = 0.0
-        for kw in keywords:
-            if kw in fact.lower():
-                score += 0.1
-        # Normalize score to be between 0 and 1
-        score = min(score, 1.0)
-        return score
+        # One pass with the precompiled, word-boundary-aware regex instead of
+        # a lowered-copy substring scan per keyword
+        return min(0.1 * len(self._KW_RE.findall(fact)), 1.0)